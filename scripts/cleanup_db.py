@@ -80,6 +80,8 @@ def cleanup_database(days_to_keep: int = 30):
         print("🧹 正在执行 VACUUM 优化数据库空间（这可能需要一点时间）...")
         original_size = db_path.stat().st_size / (1024 * 1024)
         db.vacuum()
+        # 关闭池中连接，最后一个连接关闭时完成 WAL 检查点，文件大小才会回落
+        db.close()
         final_size = db_path.stat().st_size / (1024 * 1024)
         print("✅ 数据库优化完成")
 
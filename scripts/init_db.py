@@ -8,7 +8,6 @@ sys.path.append(str(project_root))
 from scripts.rss_finance_analyzer import RSSAnalyzer
 
 db_path = project_root / "data" / "news_data.db"
-cache_path = project_root / "data" / "http_cache.json"
 
 # Ensure data dir exists
 db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -18,6 +17,6 @@ if db_path.exists():
     db_path.unlink()
 
 # Initialize database
-analyzer = RSSAnalyzer(db_path, cache_path)
+analyzer = RSSAnalyzer(db_path)
 analyzer._init_database()
 print(f"New database initialized successfully at {db_path}")
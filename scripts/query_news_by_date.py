@@ -25,6 +25,7 @@ import csv
 import json
 import os
 import sqlite3
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -120,13 +121,14 @@ def query_articles(conn: sqlite3.Connection, start: str, end: str, source: Optio
     cur = conn.execute(sql, params)
     rows = cur.fetchall()
     results: List[Dict[str, Any]] = []
+    # 日期与来源名在各行间大量重复，驻留后所有结果共享同一个字符串对象
     for r in rows:
         row_obj: Dict[str, Any] = {
             'id': r['id'],
-            'collection_date': r['collection_date'],
+            'collection_date': sys.intern(r['collection_date']),
             'title': r['title'],
             'link': r['link'],
-            'source': r['source_name'],
+            'source': sys.intern(r['source_name']),
             'published': r['published'],
             'summary': r['summary']
         }
@@ -17,26 +17,50 @@ RSS财经新闻数据收集工具（优化版）
 """
 
 import argparse
+import asyncio
+import calendar
 import json
+import logging
+import os
+import queue
 import re
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
-import html as html_lib
 
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from readability import Document
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import cchardet
+except ImportError:
+    cchardet = None
+
 from utils.logger import get_logger
 from utils.config_manager import get_config
 from utils.db_manager import DatabaseManager, retry_on_db_error
-from utils.deduplication import deduplicate_items
+from utils.deduplication import deduplicate_indices
 from utils.print_utils import (
     print_header, print_success, print_warning, print_error,
     print_info, print_statistics
@@ -44,51 +68,247 @@ from utils.print_utils import (
 
 logger = get_logger('rss_analyzer')
 
+# 使用更真实的浏览器User-Agent（提高成功率）
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+FEED_HEADERS = {
+    'User-Agent': BROWSER_USER_AGENT,
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+# 正文预抓取的默认线程数，以及单个主机的最大并发请求数
+CONTENT_FETCH_WORKERS = 20
+PER_HOST_CONCURRENCY = 2
+
+# 待提取的正文页面达到该数量时才使用进程池（页面较少时进程启动开销高于并行收益）
+CONTENT_PROCESS_POOL_MIN_PAGES = 32
+
+# 视为瞬时错误、需要退避重试的状态码
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# 超过该大小的订阅源只把前 limit 个条目交给 feedparser
+LARGE_FEED_BYTES = 1 << 20
+_ATOM_ROOT_RE = re.compile(rb'<feed[\s>]')
+_RDF_ROOT_RE = re.compile(rb'<rdf:RDF[\s>]')
+
+# 正文提取前整体剥离的非正文标签
+NON_CONTENT_TAGS = ('script', 'style', 'noscript', 'iframe')
+
+# 规范化链接时去除的跟踪参数
+TRACKING_PARAMS = frozenset({
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term',
+    'utm_content', 'spm', 'from', 'ref', 'ref_src'
+})
+
+# 预编译的正则（文本清洗在每篇文章上都会执行）
+_TITLE_LEAD_RE = re.compile(r'^[\-\s·【\[]+')
+_TITLE_TAIL_RE = re.compile(r'[\-\s·】\]]+$')
+_ENHANCE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'点击(阅读|查看).*?(原文|全文).*',
+    r'本文(来源|转载).*',
+    r'免责声明[:：].*',
+    r'责任编辑[:：].*',
+    r'微信公众.*',
+    r'版权.*(所有|归原作者所有).*',
+)]
+
+# 正文提取阈值：段落与全文的最小长度
+MIN_PARAGRAPH_LENGTH = 10
+MIN_CONTENT_LENGTH = 100
+
+# 站点正文提取规则（键为域名片段，按顺序匹配）
+#   selectors:      候选正文容器，依次尝试
+#   junk:           容器内需移除的元素
+#   tags:           只拼接这些段落标签的文本；为 None 时取容器全部文本
+#   meta_fallbacks: 优先尝试的 meta 描述（正文由前端渲染的站点）
+#   fallback:       以上均未提取到时使用的备选规则
+SITE_RULES = {
+    # 中新网财经：.left_zw 是最精确的正文容器
+    'chinanews.com': {
+        'selectors': ['.left_zw'],
+        'junk': '.editor, .adEditor, .keywords, .share, .pictext, div.pictext',
+        'tags': 'p',
+        'fallback': {
+            'selectors': ['.content_maincontent_content', '.content', '#content'],
+            'junk': '.editor, .keywords, .share',
+            'tags': None,
+        },
+    },
+    # 华尔街见闻：内容可能是React渲染的，先取 meta 描述
+    'wallstreetcn.com': {
+        'meta_fallbacks': ['meta[property="og:description"]', 'meta[name="description"]'],
+        'selectors': ['.article-content', '[class*="content"]', 'article'],
+        'junk': '.ad, .advertisement, .related, aside',
+        'tags': None,
+    },
+    # 36氪
+    '36kr.com': {
+        'selectors': ['.articleDetailContent', 'article', '.common-width', '[class*="article"]'],
+        'junk': '.ad, aside',
+        'tags': 'p, div',
+    },
+    # 东方财富
+    'eastmoney.com': {
+        'selectors': ['#ContentBody', '.Body', 'article'],
+        'junk': '.ad',
+        'tags': 'p',
+    },
+    # 第一财经
+    'yicai.com': {
+        'selectors': ['.m-txt', 'article', '.article-content'],
+        'junk': '.ad',
+        'tags': 'p',
+    },
+    # 新浪财经
+    'sina.com': {
+        'selectors': ['#artibody', '.article', 'article'],
+        'junk': '.ad, .show_author',
+        'tags': 'p',
+    },
+    # 百度百家号
+    'baijiahao.baidu.com': {
+        'selectors': ['.article-content', '#article', '[class*="article"]'],
+        'tags': 'p',
+    },
+    # 虎嗅网
+    'huxiu.com': {
+        'selectors': ['.article__content', '.article-content-wrap', 'article'],
+        'junk': '.ad',
+        'tags': 'p, div',
+    },
+    # Investing.com
+    'investing.com': {
+        'selectors': ['.article_WYSIWYG__O0uhW', 'article', '[class*="article"]'],
+        'tags': 'p',
+    },
+}
+
+
+def _disable_worker_logging():
+    """进程池子进程的初始化函数：关闭日志（继承的 RotatingFileHandler 不支持多进程同时写入）"""
+    logging.disable(logging.CRITICAL)
+
+
+def collapse_whitespace(text: str) -> str:
+    """压缩连续空白为单个空格并去除首尾空白（str.split 在C层完成，等价于 re.sub(r'\s+', ' ', text).strip()）"""
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=256)
+def match_site_rule(domain: str) -> Optional[str]:
+    """返回域名对应的 SITE_RULES 键（按域名缓存，同一站点的文章只匹配一次）"""
+    for key in SITE_RULES:
+        if key in domain:
+            return key
+    return None
+
+
+def truncate_feed(body: bytes, limit: int) -> bytes:
+    """
+    截取大体积订阅源的前 limit 个条目
+    
+    只在原始字节中查找条目结束标签，不做解析；截断后补上根元素的闭合标签，
+    feedparser 仍按完整文档解析（保留其日期解析与HTML清洗）。
+    找不到足够的条目时原样返回。
+    """
+    if len(body) <= LARGE_FEED_BYTES or limit <= 0:
+        return body
+    
+    head = body[:4096]
+    if _ATOM_ROOT_RE.search(head):
+        entry_close, root_close = b'</entry>', b'</feed>'
+    elif _RDF_ROOT_RE.search(head):
+        entry_close, root_close = b'</item>', b'</rdf:RDF>'
+    else:
+        entry_close, root_close = b'</item>', b'</channel></rss>'
+    
+    end = 0
+    for _ in range(limit):
+        end = body.find(entry_close, end)
+        if end < 0:
+            return body
+        end += len(entry_close)
+    return body[:end] + root_close
+
+
+# 按来源分组的条目：[(来源名称, [feedparser条目, ...]), ...]
+SourceEntries = List[Tuple[str, List[Any]]]
+
 
 class RSSAnalyzer:
     """RSS抓取分析器"""
     
-    def __init__(self, db_path: Path, http_cache_path: Path):
+    def __init__(self, db_path: Path):
         self.db = DatabaseManager(db_path)
-        self.http_cache_path = http_cache_path
-        self.http_cache = self._load_http_cache()
+        self._db_initialized = False
+        # 本次运行抓取到的 ETag/Last-Modified，抓取结束后一次性写入 http_cache 表
+        self._http_cache_updates: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.session = self._create_session()
+        # 正文抓取结果按规范化链接合并，多个线程请求同一链接时只下载一次
+        self._content_futures: Dict[str, Future] = {}
+        self._content_lock = threading.Lock()
+        # 正文抓取按主机限流，避免对同一站点并发过高
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        # 已入库的规范化链接，首次使用时从数据库加载一次，用于跳过旧文章
+        self._known_links: Optional[set] = None
     
-    def _load_http_cache(self) -> dict:
-        """加载HTTP缓存"""
-        if self.http_cache_path.exists():
-            try:
-                with open(self.http_cache_path, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-                    logger.debug(f"加载HTTP缓存: {len(cache)} 条")
-                    return cache
-            except Exception as e:
-                logger.warning(f"加载HTTP缓存失败: {e}")
-                return {}
-        return {}
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """创建带自动重试的HTTP会话（瞬时错误按指数退避重试）"""
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,  # 0.5s, 1s, 2s
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True  # 429 时遵循 Retry-After
+        )
+        session = requests.Session()
+        # 连接池按主机复用 TCP/TLS 连接（RSS 与正文抓取共用同一会话）
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
     
-    def _save_http_cache(self):
-        """保存HTTP缓存"""
-        try:
-            import builtins
-            self.http_cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with builtins.open(self.http_cache_path, 'w', encoding='utf-8') as f:
-                json.dump(self.http_cache, f, ensure_ascii=False, indent=2)
-            logger.debug(f"保存HTTP缓存: {len(self.http_cache)} 条")
-        except Exception as e:
-            logger.error(f"保存HTTP缓存失败: {e}")
+    def get_http_cache(self, url: str) -> dict:
+        """查询单个URL的HTTP缓存（ETag/Last-Modified）"""
+        rows = self.db.execute_query(
+            'SELECT etag, last_modified FROM http_cache WHERE url = ?', (url,)
+        )
+        if not rows:
+            return {}
+        return {'etag': rows[0]['etag'], 'last_modified': rows[0]['last_modified']}
+    
+    def _remember_http_cache(self, url: str, headers: Any):
+        """记录响应中的缓存头，待抓取结束后统一写库"""
+        self._http_cache_updates[url] = (headers.get('ETag'), headers.get('Last-Modified'))
+    
+    @retry_on_db_error(max_retries=3)
+    def _flush_http_cache(self):
+        """将本次运行的缓存头在单个事务中写入 http_cache 表"""
+        if not self._http_cache_updates:
+            return
+        
+        self._init_database()
+        rows = [(url, etag, last_modified) for url, (etag, last_modified) in self._http_cache_updates.items()]
+        self.db.execute_batch(
+            '''INSERT OR REPLACE INTO http_cache (url, etag, last_modified, updated_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)''',
+            rows
+        )
+        logger.debug(f"保存HTTP缓存: {len(rows)} 条")
+        self._http_cache_updates.clear()
     
     @staticmethod
+    @lru_cache(maxsize=65536)
     def normalize_link(raw_url: str) -> str:
-        """规范化链接"""
+        """规范化链接（按原始URL缓存结果，正文合并与入库会对同一链接重复调用）"""
         if not raw_url:
             return raw_url
         try:
             parsed = urlparse(raw_url)
             netloc = (parsed.netloc or '').lower()
-            tracked_params = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 
-                             'utm_content', 'spm', 'from', 'ref', 'ref_src'}
             q = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) 
-                 if k not in tracked_params]
+                 if k not in TRACKING_PARAMS]
             query = urlencode(q, doseq=True)
             path = parsed.path.rstrip('/')
             normalized = urlunparse((parsed.scheme, netloc, path, '', query, ''))
@@ -102,10 +322,9 @@ class RSSAnalyzer:
         """标题规范化"""
         if not title:
             return ''
-        t = title.strip()
-        t = re.sub(r'\s+', ' ', t)
-        t = re.sub(r'^[\-\s·【\[]+', '', t)
-        t = re.sub(r'[\-\s·】\]]+$', '', t)
+        t = collapse_whitespace(title)
+        t = _TITLE_LEAD_RE.sub('', t)
+        t = _TITLE_TAIL_RE.sub('', t)
         return t
     
     @staticmethod
@@ -114,17 +333,9 @@ class RSSAnalyzer:
         if not text:
             return ''
         cleaned = text
-        patterns = [
-            r'点击(阅读|查看).*?(原文|全文).*',
-            r'本文(来源|转载).*',
-            r'免责声明[:：].*',
-            r'责任编辑[:：].*',
-            r'微信公众.*',
-            r'版权.*(所有|归原作者所有).*',
-        ]
-        for p in patterns:
-            cleaned = re.sub(p, '', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        for pattern in _ENHANCE_PATTERNS:
+            cleaned = pattern.sub('', cleaned)
+        cleaned = collapse_whitespace(cleaned)
         return cleaned
     
     @staticmethod
@@ -132,357 +343,263 @@ class RSSAnalyzer:
         """HTML转文本"""
         if not raw_html:
             return ''
-        raw_html = re.sub(r'<(script|style)[\s\S]*?>[\s\S]*?</\1>', ' ', raw_html, flags=re.IGNORECASE)
-        text = re.sub(r'<[^>]+>', ' ', raw_html)
-        text = html_lib.unescape(text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
-    def _extract_with_custom_rules(self, soup: BeautifulSoup, url: str) -> str:
-        """使用自定义规则提取正文（针对特定网站）"""
-        domain = urlparse(url).netloc.lower()
-        
-        # 中新网财经
-        if 'chinanews.com' in domain:
-            # 优先使用 .left_zw（最精确的正文容器）
-            content_div = soup.select_one('.left_zw')
-            if content_div:
-                # 移除不需要的元素
-                for tag in content_div.select('script, style, .editor, .adEditor, .keywords, .share, .pictext, div.pictext'):
+        # 由HTML解析器去标签并解码实体（正则 <[^>]+> 无法处理属性值中的 <、>）
+        tree = LexborHTMLParser(raw_html)
+        tree.strip_tags(list(NON_CONTENT_TAGS), recursive=True)
+        return collapse_whitespace(tree.text(separator=' '))
+    
+    @staticmethod
+    def _extract_by_rule(tree: LexborHTMLParser, rule: dict) -> str:
+        """按 SITE_RULES 中的单条规则提取正文"""
+        # meta 描述（适用于前端渲染、正文不在HTML中的站点）
+        for selector in rule.get('meta_fallbacks', ()):
+            meta = tree.css_first(selector)
+            content = (meta.attributes.get('content') or '').strip() if meta else ''
+            if len(content) > MIN_CONTENT_LENGTH:
+                return content
+        
+        junk = rule.get('junk')
+        tags = rule.get('tags')
+        for selector in rule['selectors']:
+            content_div = tree.css_first(selector)
+            if not content_div:
+                continue
+            
+            # 移除不需要的元素（逆序删除：先子节点后祖先，避免访问已随祖先释放的节点）
+            if junk:
+                for tag in reversed(content_div.css(junk)):
                     tag.decompose()
-                
-                # 只保留p标签的文本（正文通常在p标签中）
-                paragraphs = content_div.find_all('p', recursive=True)
-                text_parts = []
-                for p in paragraphs:
-                    p_text = p.get_text(strip=True)
-                    if p_text and len(p_text) > 10:  # 忽略太短的段落
-                        text_parts.append(p_text)
-                
-                text = ' '.join(text_parts)
-                if len(text) > 100:
-                    return text
             
-            # 备选方案
-            for selector in ['.content_maincontent_content', '.content', '#content']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .editor, .keywords, .share'):
-                        tag.decompose()
-                    text = content_div.get_text(separator=' ', strip=True)
-                    if len(text) > 100:
-                        return text
-        
-        # 华尔街见闻（需要特殊处理，可能是动态加载）
-        elif 'wallstreetcn.com' in domain:
-            # 华尔街见闻的内容可能是React渲染的，直接提取可见文本
-            # 尝试从summary或description中获取内容
-            for selector in ['meta[property="og:description"]', 'meta[name="description"]']:
-                meta = soup.select_one(selector)
-                if meta and meta.get('content'):
-                    text = meta['content'].strip()
-                    if len(text) > 100:
-                        return text
+            if tags:
+                # 只保留段落文本，忽略太短的段落
+                text_parts = [p.text(strip=True) for p in content_div.css(tags)]
+                text = ' '.join(t for t in text_parts if len(t) > MIN_PARAGRAPH_LENGTH)
+            else:
+                text = content_div.text(separator=' ', strip=True)
             
-            # 尝试其他可能的容器
-            for selector in ['.article-content', '[class*="content"]', 'article']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad, .advertisement, .related, aside'):
-                        tag.decompose()
-                    text = content_div.get_text(separator=' ', strip=True)
-                    if len(text) > 100:
-                        return text
-        
-        # 36氪
-        elif '36kr.com' in domain:
-            for selector in ['.articleDetailContent', 'article', '.common-width', '[class*="article"]']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad, aside'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all(['p', 'div'], recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # 东方财富
-        elif 'eastmoney.com' in domain:
-            for selector in ['#ContentBody', '.Body', 'article']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all('p', recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # 第一财经
-        elif 'yicai.com' in domain:
-            for selector in ['.m-txt', 'article', '.article-content']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all('p', recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # 新浪财经
-        elif 'sina.com' in domain or 'finance.sina.com' in domain:
-            for selector in ['#artibody', '.article', 'article']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad, .show_author'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all('p', recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # 百度百家号
-        elif 'baijiahao.baidu.com' in domain:
-            for selector in ['.article-content', '#article', '[class*="article"]']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all('p', recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # 虎嗅网
-        elif 'huxiu.com' in domain:
-            for selector in ['.article__content', '.article-content-wrap', 'article']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, .ad'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all(['p', 'div'], recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
-        
-        # Investing.com
-        elif 'investing.com' in domain:
-            for selector in ['.article_WYSIWYG__O0uhW', 'article', '[class*="article"]']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style'):
-                        tag.decompose()
-                    
-                    paragraphs = content_div.find_all('p', recursive=True)
-                    text_parts = []
-                    for p in paragraphs:
-                        p_text = p.get_text(strip=True)
-                        if p_text and len(p_text) > 10:
-                            text_parts.append(p_text)
-                    
-                    text = ' '.join(text_parts)
-                    if len(text) > 100:
-                        return text
+            if len(text) > MIN_CONTENT_LENGTH:
+                return text
         
-        return ''
+        fallback = rule.get('fallback')
+        return RSSAnalyzer._extract_by_rule(tree, fallback) if fallback else ''
+    
+    @staticmethod
+    def _parse_page(html_content: str) -> LexborHTMLParser:
+        """解析网页，并在整棵树上一次性剥离脚本/样式等非正文节点"""
+        tree = LexborHTMLParser(html_content)
+        tree.strip_tags(list(NON_CONTENT_TAGS), recursive=True)
+        return tree
+    
+    @staticmethod
+    def _decode_html(content: bytes) -> str:
+        """解码网页：优先用 cchardet 一次探测编码，否则按常见中文编码依次尝试"""
+        if cchardet is not None:
+            encoding = (cchardet.detect(content).get('encoding') or 'utf-8').lower()
+            # GB2312/GBK 统一按超集 GB18030 解码，避免生僻字乱码
+            if encoding in ('gb2312', 'gbk'):
+                encoding = 'gb18030'
+            try:
+                return content.decode(encoding, errors='ignore')
+            except LookupError:
+                pass
+        
+        for encoding in ['utf-8', 'gbk', 'gb2312', 'gb18030', 'latin1']:
+            try:
+                return content.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+        return content.decode('utf-8', errors='ignore')
     
     def fetch_article_content(self, url: str, timeout: int = 10) -> str:
-        """抓取文章正文（智能提取）"""
+        """抓取文章正文（智能提取，同一链接并发请求时合并为一次下载）"""
+        key = self.normalize_link(url)
+        with self._content_lock:
+            future = self._content_futures.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._content_futures[key] = future
+        
+        if is_owner:
+            future.set_result(self._download_article_content(url, timeout))
+        return future.result()
+    
+    def _host_semaphore(self, url: str) -> threading.Semaphore:
+        """获取链接所属主机的并发信号量（每个主机最多 PER_HOST_CONCURRENCY 个请求）"""
+        host = urlparse(url).netloc.lower()
+        with self._content_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.Semaphore(PER_HOST_CONCURRENCY)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    def _download_article_content(self, url: str, timeout: int = 10) -> str:
+        """下载网页并提取正文，失败返回空字符串"""
         try:
-            resp = requests.get(url, timeout=timeout, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
+            with self._host_semaphore(url):
+                resp = self.session.get(url, timeout=timeout, headers={'User-Agent': BROWSER_USER_AGENT})
             resp.raise_for_status()
             
             # 处理编码
             if resp.encoding and resp.encoding.lower() not in ['utf-8', 'utf8']:
-                for encoding in ['utf-8', 'gbk', 'gb2312', 'gb18030', 'latin1']:
-                    try:
-                        html_content = resp.content.decode(encoding)
-                        break
-                    except (UnicodeDecodeError, LookupError):
-                        continue
-                else:
-                    html_content = resp.content.decode('utf-8', errors='ignore')
+                html_content = self._decode_html(resp.content)
             else:
                 html_content = resp.text
             
-            # 策略1：使用自定义规则（针对特定网站）
-            soup = BeautifulSoup(html_content, 'lxml')
-            custom_text = self._extract_with_custom_rules(soup, url)
-            if custom_text and len(custom_text) > 100:
+            return self.extract_article_text(html_content, url)
+        
+        except Exception as e:
+            # 静默失败，正文抓取失败很常见（403/404等）
+            logger.debug(f"正文抓取异常 {url}: {e}")
+            return ''
+    
+    @staticmethod
+    def _extract_from_body(body: bytes, charset: Optional[str], url: str) -> str:
+        """解码网页并提取正文（可在子进程中执行，参数与返回值都是可序列化的基本类型）"""
+        if charset and charset.lower() in ['utf-8', 'utf8']:
+            html_content = body.decode(charset, errors='replace')
+        else:
+            html_content = RSSAnalyzer._decode_html(body)
+        return RSSAnalyzer.extract_article_text(html_content, url)
+    
+    @staticmethod
+    def extract_article_text(html_content: str, url: str) -> str:
+        """从网页HTML中提取正文（自定义规则 → readability → 通用规则）"""
+        # 整页DOM只在确实需要时构建：没有自定义规则的站点若 readability 成功，
+        # 就只有 readability 内部的一次解析
+        tree = None
+        
+        # 策略1：使用自定义规则（针对特定网站）
+        rule_key = match_site_rule(urlparse(url).netloc.lower())
+        if rule_key is not None:
+            tree = RSSAnalyzer._parse_page(html_content)
+            custom_text = RSSAnalyzer._extract_by_rule(tree, SITE_RULES[rule_key])
+            if custom_text and len(custom_text) > MIN_CONTENT_LENGTH:
                 logger.debug(f"使用自定义规则提取正文: {url}")
                 return custom_text
+        
+        # 策略2：使用 readability-lxml（通用智能提取）
+        try:
+            doc = Document(html_content)
+            article_html = doc.summary()
             
-            # 策略2：使用 readability-lxml（通用智能提取）
-            try:
-                doc = Document(html_content)
-                article_html = doc.summary()
-                
-                # 解析提取的HTML
-                article_soup = BeautifulSoup(article_html, 'lxml')
-                
-                # 移除不需要的标签
-                for tag in article_soup.select('script, style, iframe, nav, header, footer, aside'):
-                    tag.decompose()
-                
-                # 提取文本
-                text = article_soup.get_text(separator=' ', strip=True)
-                
-                # 清理多余空白
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                if len(text) > 100:
-                    logger.debug(f"使用Readability提取正文: {url}")
-                    return text
-            except Exception as e:
-                logger.debug(f"Readability提取失败 {url}: {e}")
+            # 解析提取的HTML
+            article_tree = LexborHTMLParser(article_html)
             
-            # 策略3：通用规则（作为后备）
-            # 尝试常见的正文容器
-            for selector in ['article', '.article', '#article', '.content', '#content', 
-                           '.post-content', '.entry-content', 'main']:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    for tag in content_div.select('script, style, nav, header, footer, aside'):
-                        tag.decompose()
-                    text = content_div.get_text(separator=' ', strip=True)
-                    text = re.sub(r'\s+', ' ', text).strip()
-                    if len(text) > 100:
-                        logger.debug(f"使用通用规则提取正文: {url}")
-                        return text
+            # 移除不需要的标签
+            for tag in reversed(article_tree.css('script, style, iframe, nav, header, footer, aside')):
+                tag.decompose()
             
-            # 如果所有策略都失败，返回空
-            logger.debug(f"无法提取有效正文: {url}")
-            return ''
+            # 提取文本
+            text = article_tree.text(separator=' ', strip=True)
+            
+            # 清理多余空白
+            text = collapse_whitespace(text)
             
+            if len(text) > MIN_CONTENT_LENGTH:
+                logger.debug(f"使用Readability提取正文: {url}")
+                return text
         except Exception as e:
-            # 静默失败，正文抓取失败很常见（403/404等）
-            logger.debug(f"正文抓取异常 {url}: {e}")
-            return ''
+            logger.debug(f"Readability提取失败 {url}: {e}")
+        
+        # 策略3：通用规则（作为后备）
+        if tree is None:
+            tree = RSSAnalyzer._parse_page(html_content)
+        
+        # 尝试常见的正文容器
+        for selector in ['article', '.article', '#article', '.content', '#content', 
+                       '.post-content', '.entry-content', 'main']:
+            content_div = tree.css_first(selector)
+            if content_div:
+                for tag in reversed(content_div.css('nav, header, footer, aside')):
+                    tag.decompose()
+                text = content_div.text(separator=' ', strip=True)
+                text = collapse_whitespace(text)
+                if len(text) > MIN_CONTENT_LENGTH:
+                    logger.debug(f"使用通用规则提取正文: {url}")
+                    return text
+        
+        # 如果所有策略都失败，返回空
+        logger.debug(f"无法提取有效正文: {url}")
+        return ''
+    
+    @staticmethod
+    def _parse_feed(body: bytes, content_type: str, source_name: str, limit: int) -> List[Any]:
+        """解析已下载的RSS内容，返回前 limit 条"""
+        # 直接解析已下载的字节，并把响应头里的字符集交给feedparser，
+        # 避免其再做一轮编码探测（HTTP 客户端已完成 gzip 解压）。
+        # 保留 feedparser 的 HTML 清洗：入库前不再另做 HTML 去标签，摘要依赖它去除脚本等危险内容
+        # 数MB的订阅源只解析需要的前 limit 个条目，避免整份文档进入解析器
+        feed = feedparser.parse(truncate_feed(body, limit), response_headers={'content-type': content_type})
+        
+        # 检查feed是否有效
+        if not feed.entries:
+            logger.debug(f"{source_name}: RSS解析成功但无条目")
+            return []
+        
+        # 只保留前 limit 条（切片只复制少量引用，调用方需要 list）
+        entries = feed.entries[:limit]
+        logger.debug(f"{source_name}: 成功获取 {len(entries)} 条")
+        return entries
     
     def fetch_rss_feed(self, url: str, source_name: str, limit: int = 5) -> List[Any]:
         """获取RSS源内容（支持缓存和重试）"""
-        # 使用更真实的浏览器User-Agent（提高成功率）
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        }
+        headers = dict(FEED_HEADERS)
         
         # 条件GET（暂时禁用，避免304导致的"无数据"假象）
-        # cache_entry = self.http_cache.get(url, {})
+        # cache_entry = self.get_http_cache(url)
         # if cache_entry.get('etag'):
         #     headers['If-None-Match'] = cache_entry['etag']
         # if cache_entry.get('last_modified'):
         #     headers['If-Modified-Since'] = cache_entry['last_modified']
         
         last_err = None
-        for attempt in range(1, 5):  # 增加到5次重试
+        for attempt in range(1, 5):
             try:
                 # 增加超时到30秒（GitHub Actions网络环境可能较慢）
-                response = requests.get(url, timeout=30, headers=headers, allow_redirects=True)
+                # 超时、连接重置、429/5xx 已由会话上的 Retry 自动退避重试
+                response = self.session.get(url, timeout=30, headers=headers, allow_redirects=True)
                 if response.status_code == 304:
                     logger.debug(f"{source_name}: 无更新（304 Not Modified）")
                     return []
                 response.raise_for_status()
                 
                 # 更新缓存
-                self.http_cache[url] = {
-                    'etag': response.headers.get('ETag'),
-                    'last_modified': response.headers.get('Last-Modified')
-                }
-                
-                feed = feedparser.parse(response.content)
-                
-                # 检查feed是否有效
-                if not feed.entries:
-                    logger.debug(f"{source_name}: RSS解析成功但无条目")
-                    return []
-                
-                entries = feed.entries[:limit] if len(feed.entries) > limit else feed.entries
-                logger.debug(f"{source_name}: 成功获取 {len(entries)} 条")
-                return entries
+                self._remember_http_cache(url, response.headers)
                 
+                return self._parse_feed(
+                    response.content, response.headers.get('Content-Type', ''), source_name, limit
+                )
+            
             except requests.exceptions.Timeout as e:
                 last_err = f"超时: {e}"
-                logger.warning(f"{source_name} 第{attempt}次尝试超时")
+                logger.warning(f"{source_name} 请求超时（已自动重试）")
             except requests.exceptions.HTTPError as e:
                 last_err = f"HTTP错误: {e}"
-                # 对于403错误（反爬虫），增加更长的等待时间
-                if hasattr(e, 'response') and e.response is not None and e.response.status_code == 403:
-                    logger.warning(f"{source_name} 第{attempt}次遭遇403（反爬虫），等待后重试")
-                    if attempt < 5:
-                        wait_time = min(30, 5 * attempt)  # 5s, 10s, 15s, 20s
-                        logger.debug(f"{source_name} 403错误，等待 {wait_time} 秒...")
-                        time.sleep(wait_time)
+                # 403（反爬虫）不属于瞬时错误，不在 Retry 范围内，单独等待更长时间后重试
+                if e.response is not None and e.response.status_code == 403 and attempt < 4:
+                    wait_time = 5 * attempt  # 5s, 10s, 15s
+                    logger.warning(f"{source_name} 第{attempt}次遭遇403（反爬虫），等待 {wait_time} 秒后重试")
+                    time.sleep(wait_time)
                     continue
-                else:
-                    logger.warning(f"{source_name} 第{attempt}次HTTP错误: {str(e)[:60]}")
+                logger.warning(f"{source_name} HTTP错误: {str(e)[:60]}")
             except requests.exceptions.RequestException as e:
                 last_err = f"请求失败: {e}"
-                logger.warning(f"{source_name} 第{attempt}次尝试失败: {str(e)[:60]}")
+                logger.warning(f"{source_name} 请求失败（已自动重试）: {str(e)[:60]}")
             except Exception as e:
                 last_err = f"未知错误: {e}"
-                logger.warning(f"{source_name} 第{attempt}次尝试异常: {str(e)[:60]}")
-            
-            # 指数退避，增加等待时间
-            if attempt < 5:
-                wait_time = min(15, 3 ** attempt)  # 3秒, 9秒, 15秒, 15秒
-                logger.debug(f"{source_name} 等待 {wait_time} 秒后重试...")
-                time.sleep(wait_time)
+                logger.warning(f"{source_name} 抓取异常: {str(e)[:60]}")
+            break
         
         # 所有尝试失败，记录错误
-        logger.error(f"{source_name} 抓取失败（重试5次）: {last_err}")
+        logger.error(f"{source_name} 抓取失败: {last_err}")
         return []
     
     def fetch_all_sources_parallel(self, rss_sources: dict, limit: int = 5, 
-                                   max_workers: int = 5) -> List[Any]:
-        """并发抓取所有RSS源"""
-        all_entries = []
+                                   max_workers: int = 5) -> SourceEntries:
+        """并发抓取所有RSS源（按来源分组返回，不修改条目对象）"""
+        all_entries: SourceEntries = []
         
         # 记录开始时间
         start_time = time.time()
@@ -495,9 +612,6 @@ class RSSAnalyzer:
             }
             
             # 使用进度条
-            success_count = 0
-            fail_count = 0
-            success_sources = []
             failed_sources = []
             
             with tqdm(
@@ -514,14 +628,9 @@ class RSSAnalyzer:
                         # 获取结果，设置超时以避免永久阻塞
                         entries = future.result(timeout=120)  # 2分钟超时
                         if entries:
-                            for entry in entries:
-                                entry.source = source_name
-                            all_entries.extend(entries)
-                            success_count += 1
-                            success_sources.append((source_name, len(entries)))
+                            all_entries.append((source_name, entries))
                             logger.info(f"✅ {source_name}: {len(entries)} 篇")
                         else:
-                            fail_count += 1
                             failed_sources.append(source_name)
                             # 当返回空列表时，查看是否有异常信息
                             exc_info = future.exception()
@@ -530,37 +639,253 @@ class RSSAnalyzer:
                             else:
                                 logger.warning(f"⚠️ {source_name}: 返回空结果（可能是RSS源无内容或所有重试失败）")
                     except Exception as e:
-                        fail_count += 1
                         failed_sources.append(source_name)
                         logger.error(f"❌ {source_name}: 并发异常 - {type(e).__name__}: {str(e)[:60]}", exc_info=True)
                     
                     pbar.update(1)
         
-        # 计算耗时
-        elapsed = time.time() - start_time
-        
-        # 打印摘要
-        print(f"✓ 抓取完成: {success_count}/{len(rss_sources)} 个源，{len(all_entries)} 篇文章（耗时 {elapsed:.1f}s）")
+        self._flush_http_cache()
+        self._print_fetch_summary(len(rss_sources), all_entries, failed_sources, time.time() - start_time)
+        return all_entries
+    
+    @staticmethod
+    def _print_fetch_summary(total: int, all_entries: SourceEntries,
+                             failed_sources: List[str], elapsed: float):
+        """打印抓取摘要（详细列表用于GitHub Actions日志）"""
+        print(f"✓ 抓取完成: {len(all_entries)}/{total} 个源，{count_entries(all_entries)} 篇文章（耗时 {elapsed:.1f}s）")
         
-        # 打印详细列表（用于GitHub Actions日志）
-        if success_sources:
-            print(f"\n  ✅ 成功的源 ({success_count}):")
-            for source, count in success_sources:
-                print(f"     • {source}: {count} 篇")
+        if all_entries:
+            print(f"\n  ✅ 成功的源 ({len(all_entries)}):")
+            for source, entries in all_entries:
+                print(f"     • {source}: {len(entries)} 篇")
         
         if failed_sources:
-            print(f"\n  ⚠️ 失败或无数据的源 ({fail_count}):")
+            print(f"\n  ⚠️ 失败或无数据的源 ({len(failed_sources)}):")
             for source in failed_sources:
                 print(f"     • {source}")
+    
+    async def _fetch_feed_async(self, session: 'aiohttp.ClientSession', url: str,
+                                source_name: str, limit: int) -> List[Any]:
+        """异步获取单个RSS源（重试策略与 fetch_rss_feed 一致，解析在默认线程池中执行）"""
+        loop = asyncio.get_running_loop()
+        last_err = None
+        for attempt in range(1, 5):
+            wait_time = 0
+            try:
+                async with session.get(url, headers=FEED_HEADERS) as response:
+                    if response.status == 304:
+                        logger.debug(f"{source_name}: 无更新（304 Not Modified）")
+                        return []
+                    if response.status in RETRY_STATUSES or response.status == 403:
+                        last_err = f"HTTP错误: {response.status}"
+                        if attempt < 4:
+                            if response.status == 403:
+                                wait_time = 5 * attempt  # 403（反爬虫）等待更久
+                            else:
+                                retry_after = response.headers.get('Retry-After', '')
+                                wait_time = int(retry_after) if retry_after.isdigit() else 0.5 * 2 ** (attempt - 1)
+                    else:
+                        response.raise_for_status()
+                        body = await response.read()
+                        content_type = response.headers.get('Content-Type', '')
+                        self._remember_http_cache(url, response.headers)
+                        # feedparser 解析放到事件循环的默认线程池，不阻塞其他源的下载；
+                        # 每个源只有几个条目，解析耗时远小于启动子进程的开销，留在本进程内执行
+                        return await loop.run_in_executor(
+                            None, RSSAnalyzer._parse_feed, body, content_type, source_name, limit
+                        )
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                last_err = f"请求失败: {type(e).__name__} {e}"
+                if attempt < 4:
+                    wait_time = 0.5 * 2 ** (attempt - 1)
+            except Exception as e:
+                last_err = f"未知错误: {e}"
+                logger.warning(f"{source_name} 抓取异常: {str(e)[:60]}")
+            
+            if not wait_time:
+                break
+            logger.warning(f"{source_name} 第{attempt}次失败（{last_err}），{wait_time} 秒后重试")
+            await asyncio.sleep(wait_time)
+        
+        logger.error(f"{source_name} 抓取失败: {last_err}")
+        return []
+    
+    async def _fetch_all_async(self, rss_sources: dict, limit: int,
+                               concurrency: int) -> List[Tuple[str, List[Any]]]:
+        """在同一个事件循环中并发抓取所有RSS源"""
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=PER_HOST_CONCURRENCY)
+        # 按连接和读取分别计时（与 fetch_rss_feed 中 requests 的 timeout=30 一致），
+        # 在连接池中排队等待同主机连接的时间不计入超时
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+        results = []
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch_one(name: str, url: str):
+                return name, await self._fetch_feed_async(session, url, name, limit)
+            
+            with tqdm(
+                total=len(rss_sources),
+                desc="📡 抓取RSS",
+                bar_format='{desc}: {percentage:3.0f}%|{bar:25}| {n}/{total}',
+                ncols=70,
+                leave=False,
+                dynamic_ncols=False
+            ) as pbar:
+                for future in asyncio.as_completed([fetch_one(n, u) for n, u in rss_sources.items()]):
+                    results.append(await future)
+                    pbar.update(1)
+        
+        return results
+    
+    def fetch_all_sources_async(self, rss_sources: dict, limit: int = 5,
+                                concurrency: int = 64, max_workers: int = 5) -> SourceEntries:
+        """
+        基于 asyncio + aiohttp 并发抓取所有RSS源（未安装 aiohttp 时退回线程池）
+        
+        concurrency 为 aiohttp 的最大并发连接数；max_workers 为退回线程池时的线程数
+        """
+        if aiohttp is None:
+            logger.info(f"未安装 aiohttp，使用线程池抓取（{max_workers} 线程）")
+            return self.fetch_all_sources_parallel(rss_sources, limit, max_workers)
+        
+        start_time = time.time()
+        all_entries: SourceEntries = []
+        failed_sources = []
+        
+        for source_name, entries in asyncio.run(self._fetch_all_async(rss_sources, limit, concurrency)):
+            if entries:
+                all_entries.append((source_name, entries))
+                logger.info(f"✅ {source_name}: {len(entries)} 篇")
+            else:
+                failed_sources.append(source_name)
+                logger.warning(f"⚠️ {source_name}: 返回空结果（可能是RSS源无内容或所有重试失败）")
         
+        self._flush_http_cache()
+        self._print_fetch_summary(len(rss_sources), all_entries, failed_sources, time.time() - start_time)
         return all_entries
     
+    async def _fetch_contents_async(self, urls: List[str], concurrency: int,
+                                    timeout: int = 10) -> Dict[str, str]:
+        """并发下载文章网页，解码和正文提取在线程池执行（页面较多时改用进程池）"""
+        loop = asyncio.get_running_loop()
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=PER_HOST_CONCURRENCY)
+        # 正文提取是纯 CPU 的解析和文本处理，页面多时在线程中会与事件循环争抢 GIL，
+        # 此时交给子进程（只接收网页字节、返回正文字符串，子进程不写日志）；
+        # 页面少时留在本进程，由事件循环的默认线程池执行（pool 为 None）
+        if len(urls) >= CONTENT_PROCESS_POOL_MIN_PAGES:
+            pool_context = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, len(urls)),
+                initializer=_disable_worker_logging
+            )
+        else:
+            pool_context = nullcontext()
+        
+        with pool_context as pool:
+            # 不设总超时：total 会把在连接池中排队（每主机最多 PER_HOST_CONCURRENCY 个）
+            # 的时间也算进去，排在慢请求之后的文章会在发出前就超时；
+            # 改为按连接和读取分别计时，与 requests 的 timeout 语义一致
+            async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout),
+                headers={'User-Agent': BROWSER_USER_AGENT}
+            ) as session:
+                async def fetch_one(url: str):
+                    try:
+                        async with session.get(url) as resp:
+                            resp.raise_for_status()
+                            body = await resp.read()
+                            charset = resp.charset
+                        text = await loop.run_in_executor(pool, RSSAnalyzer._extract_from_body, body, charset, url)
+                    except Exception as e:
+                        # 静默失败，正文抓取失败很常见（403/404等）
+                        logger.debug(f"正文抓取异常 {url}: {e}")
+                        text = ''
+                    return url, text
+                
+                pairs = await asyncio.gather(*(fetch_one(url) for url in urls))
+        
+        return dict(pairs)
+    
+    def prefetch_article_contents(self, urls: List[str], max_workers: int = CONTENT_FETCH_WORKERS,
+                                  concurrency: int = 64) -> Dict[str, str]:
+        """
+        并发预抓取多篇文章正文（优先使用 aiohttp，未安装时使用线程池）
+        
+        Returns:
+            {url: 正文}
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+        if aiohttp is not None:
+            return asyncio.run(self._fetch_contents_async(unique_urls, concurrency))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_urls, executor.map(self.fetch_article_content, unique_urls)))
+    
+    def _build_article_row(self, source_id: int, entry: Any, collection_date: str,
+                           fetch_content: bool = False, content_max_length: int = 0,
+                           contents: Optional[Dict[str, str]] = None) -> tuple:
+        """将单个条目转换为 news_articles 的插入行（contents 为预抓取的 {链接: 正文}，传入时不再单独抓取）"""
+        # 每个条目的字段只读取一次，供后续各处复用
+        title = entry.get('title', 'N/A')
+        link = entry.get('link', 'N/A')
+        summary = entry.get('summary', 'N/A') or ''
+        published = entry.get('published', 'N/A')
+        
+        # 处理发布时间（feedparser 给出的是 UTC struct_time，转为 unix 秒便于索引和范围查询）
+        published_parsed = entry.get('published_parsed')
+        published_ts = calendar.timegm(published_parsed) if published_parsed else None
+        
+        # 文本增强
+        summary_text = self.enhance_text_quality(summary)
+        
+        # 抓取正文（可选）；未抓取时该列直接为 NULL
+        content_text = None
+        if fetch_content:
+            if contents is not None:
+                # 正文已在写事务开始前预抓取；未命中的链接直接回退到摘要，
+                # 行数据由 executemany 在事务中消费，这里不能发起网络请求
+                content_text = contents.get(link)
+            elif link and link != 'N/A':
+                # 流水线模式在抓取线程中组装行数据，此时尚未开始写事务
+                content_text = self.fetch_article_content(link)
+            # 无正文时回退到摘要，摘要已清洗过，不再重复增强
+            content_text = self.enhance_text_quality(content_text) if content_text else summary_text
+            
+            # 截断长度
+            if content_max_length > 0:
+                content_text = content_text[:content_max_length]
+        
+        return (
+            collection_date,
+            self.normalize_title(title),
+            self.normalize_link(link),
+            source_id,
+            published,
+            published_ts,
+            summary_text,
+            content_text,
+            None  # category
+        )
+    
+    def _insert_articles(self, article_rows: Iterable[tuple]) -> int:
+        """在单个事务中批量插入文章行（可传入生成器，边生成边写入）"""
+        sql = '''
+            INSERT OR IGNORE INTO news_articles 
+            (collection_date, title, link, source_id, published, published_ts, summary, content, category)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        
+        return self.db.execute_many(sql, article_rows)
+    
     @retry_on_db_error(max_retries=3)
-    def save_to_database(self, entries: List[Any], collection_date: str,
+    def save_to_database(self, source_entries: SourceEntries, collection_date: str,
                         rss_sources: dict, fetch_content: bool = False,
-                        content_max_length: int = 0) -> int:
+                        content_max_length: int = 0,
+                        max_workers: int = CONTENT_FETCH_WORKERS) -> int:
         """批量保存到数据库"""
-        if not entries:
+        if not source_entries:
             return 0
         
         # 初始化数据库表
@@ -569,75 +894,194 @@ class RSSAnalyzer:
         # 获取或创建来源映射
         source_map = self._get_source_map(rss_sources)
         
-        # 准备文章数据
-        article_data = []
+        # 已入库的文章在这里剔除，INSERT OR IGNORE 仅作为最后一道保障
+        new_source_entries: SourceEntries = [
+            (source_name, self._new_entries(entries)) for source_name, entries in source_entries
+        ]
+        
+        # 正文预抓取：并发下载全部新文章，避免在逐条处理中串行等待网络
+        contents = None
+        if fetch_content:
+            contents = self.prefetch_article_contents(
+                [e.get('link') for _, entries in new_source_entries for e in entries if e.get('link')],
+                max_workers=max_workers
+            )
+        
+        # 来源ID按分组解析一次，条目对象上不再携带来源属性
+        def iter_rows():
+            for source_name, entries in new_source_entries:
+                source_id = source_map.get(source_name)
+                if source_id is None:
+                    continue
+                for entry in entries:
+                    yield source_id, entry
+        
+        # 行数据由生成器边构建边交给 executemany，不再先物化整个列表
+        article_rows = (
+            self._build_article_row(
+                source_id, entry, collection_date, fetch_content, content_max_length, contents
+            )
+            for source_id, entry in tqdm(
+                iter_rows(), 
+                total=count_entries(new_source_entries),
+                desc="📝 处理数据", 
+                ncols=70, 
+                bar_format='{desc}: {percentage:3.0f}%|{bar:25}| {n}/{total}',
+                leave=False,
+                dynamic_ncols=False
+            )
+        )
+        
+        # 批量插入（单个事务）
+        inserted = self._insert_articles(article_rows)
+        if inserted:
+            self._rebuild_fts()
+        self._known_links.update(
+            self.normalize_link(e.get('link', 'N/A')) for _, entries in new_source_entries for e in entries
+        )
+        print(f"✓ 保存完成: {inserted} 篇新文章入库")
+        
+        return inserted
+    
+    def fetch_and_save_pipeline(self, rss_sources: dict, collection_date: str,
+                                limit: int = 5, max_workers: int = 5,
+                                fetch_content: bool = False,
+                                content_max_length: int = 0) -> Tuple[SourceEntries, int]:
+        """
+        生产者/消费者方式抓取并入库
+        
+        多个抓取线程负责下载、解析和组装插入行，结果放入有界队列；
+        唯一的写入线程从队列取出并缓冲，全部抓取完成后一次性批量写入，
+        SQLite 始终只由一个线程访问。
+        
+        Returns:
+            (按来源分组的条目, 新入库文章数)
+        """
+        self._init_database()
+        source_map = self._get_source_map(rss_sources)
+        # 在抓取线程启动前加载，线程内只读
+        known_links = self._load_known_links()
+        
+        q: queue.Queue = queue.Queue(maxsize=64)
+        sentinel = object()
+        
+        all_entries: SourceEntries = []
+        failed_sources: List[str] = []
+        writer_result = {'inserted': 0, 'error': None}
+        
+        start_time = time.time()
+        
+        def fetcher(name: str, url: str):
+            rows = []
+            try:
+                entries = self.fetch_rss_feed(url, name, limit)
+                source_id = source_map.get(name)
+                if entries and source_id is not None:
+                    rows = [
+                        self._build_article_row(source_id, entry, collection_date,
+                                                fetch_content, content_max_length)
+                        for entry in self._new_entries(entries)
+                    ]
+            except Exception as e:
+                logger.error(f"❌ {name}: 抓取线程异常 - {type(e).__name__}: {str(e)[:60]}", exc_info=True)
+                entries = []
+            q.put((name, entries, rows))
+        
+        def writer(pbar):
+            article_data = []
+            while True:
+                item = q.get()
+                if item is sentinel:
+                    break
+                name, entries, rows = item
+                if entries:
+                    all_entries.append((name, entries))
+                    article_data.extend(rows)
+                    logger.info(f"✅ {name}: {len(entries)} 篇")
+                else:
+                    failed_sources.append(name)
+                    logger.warning(f"⚠️ {name}: 返回空结果（可能是RSS源无内容或所有重试失败）")
+                pbar.update(1)
+            
+            # 所有抓取线程结束后统一落库（单个事务）
+            try:
+                if article_data:
+                    writer_result['inserted'] = self.db.execute_with_retry(
+                        lambda: self._insert_articles(article_data)
+                    )
+                    if writer_result['inserted']:
+                        self._rebuild_fts()
+                    known_links.update(row[2] for row in article_data)
+                self._flush_http_cache()
+            except Exception as e:
+                writer_result['error'] = e
         
-        for entry in tqdm(
-            entries, 
-            desc="📝 处理数据", 
-            ncols=70, 
+        with tqdm(
+            total=len(rss_sources),
+            desc="📡 抓取RSS",
             bar_format='{desc}: {percentage:3.0f}%|{bar:25}| {n}/{total}',
+            ncols=70,
             leave=False,
             dynamic_ncols=False
-        ):
-            source_name = getattr(entry, 'source', 'Unknown')
-            source_id = source_map.get(source_name)
+        ) as pbar:
+            writer_thread = threading.Thread(target=writer, args=(pbar,), name='rss-writer')
+            writer_thread.start()
             
-            if source_id is None:
-                continue
-            
-            # 处理发布时间
-            published = entry.get('published', 'N/A')
-            published_parsed = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_parsed = json.dumps(list(entry.published_parsed))
-            
-            # 抓取正文（可选）
-            content_text = ''
-            if fetch_content:
-                content_text = self.fetch_article_content(entry.get('link', ''))
-                if not content_text:
-                    content_text = entry.get('summary', 'N/A') or ''
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for name, url in rss_sources.items():
+                    executor.submit(fetcher, name, url)
             
-            # 截断长度
-            if content_text and content_max_length > 0:
-                content_text = content_text[:content_max_length]
-            
-            # 文本增强
-            summary_text = self.enhance_text_quality(entry.get('summary', 'N/A') or '')
-            if content_text:
-                content_text = self.enhance_text_quality(content_text)
-            
-            # 规范化
-            norm_title = self.normalize_title(entry.get('title', 'N/A'))
-            norm_link = self.normalize_link(entry.get('link', 'N/A'))
-            
-            article_data.append((
-                collection_date,
-                norm_title,
-                norm_link,
-                source_id,
-                published,
-                published_parsed,
-                summary_text,
-                content_text if fetch_content else None,
-                None  # category
-            ))
-        
-        # 批量插入
-        sql = '''
-            INSERT OR IGNORE INTO news_articles 
-            (collection_date, title, link, source_id, published, published_parsed, summary, content, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
+            q.put(sentinel)
+            writer_thread.join()
         
-        inserted = self.db.execute_batch(sql, article_data, batch_size=100)
+        if writer_result['error'] is not None:
+            raise writer_result['error']
+        
+        inserted = writer_result['inserted']
+        self._print_fetch_summary(len(rss_sources), all_entries, failed_sources, time.time() - start_time)
         print(f"✓ 保存完成: {inserted} 篇新文章入库")
         
+        return all_entries, inserted
+    
+    @retry_on_db_error(max_retries=3)
+    def save_tags(self, tag_rows: List[Tuple[int, str, str]], bulk: bool = False) -> int:
+        """
+        批量保存文章标签
+        
+        Args:
+            tag_rows: [(article_id, tag_type, tag_value), ...]
+            bulk: 批量回填模式。先删除 idx_tags_value，写入完成后一次性重建，
+                  比逐行维护索引更快；日常增量写入保持默认 False
+        
+        Returns:
+            写入的标签数
+        """
+        if not tag_rows:
+            return 0
+        
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            if bulk:
+                cursor.execute('DROP INDEX IF EXISTS idx_tags_value')
+            
+            cursor.executemany(
+                'INSERT INTO news_tags (article_id, tag_type, tag_value) VALUES (?, ?, ?)',
+                tag_rows
+            )
+            inserted = cursor.rowcount
+            
+            if bulk:
+                # 同一事务内重建，失败时连同数据一起回滚，不会留下缺失索引的表
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_value ON news_tags(tag_value)')
+        
+        logger.debug(f"保存标签: {inserted} 条（bulk={bulk}）")
         return inserted
     
     def _init_database(self):
-        """初始化数据库表结构"""
+        """初始化数据库表结构（每个实例只执行一次）"""
+        if self._db_initialized:
+            return
+        
         with self.db.transaction() as conn:
             cursor = conn.cursor()
             
@@ -661,6 +1105,7 @@ class RSSAnalyzer:
                     source_id INTEGER NOT NULL,
                     published TEXT,
                     published_parsed TEXT,
+                    published_ts INTEGER,
                     summary TEXT,
                     content TEXT,
                     category TEXT,
@@ -682,16 +1127,45 @@ class RSSAnalyzer:
                 )
             ''')
             
-            # 创建索引
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_collection_date ON news_articles(collection_date)')
+            # 创建HTTP缓存表（条件GET使用的 ETag/Last-Modified）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # 旧库迁移：补充 published_ts 列，并从 published_parsed（JSON 数组）回填
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(news_articles)')}
+            if 'published_ts' not in columns:
+                cursor.execute('ALTER TABLE news_articles ADD COLUMN published_ts INTEGER')
+                cursor.execute('''
+                    UPDATE news_articles
+                    SET published_ts = CAST(strftime('%s', printf('%04d-%02d-%02d %02d:%02d:%02d',
+                        json_extract(published_parsed, '$[0]'), json_extract(published_parsed, '$[1]'),
+                        json_extract(published_parsed, '$[2]'), json_extract(published_parsed, '$[3]'),
+                        json_extract(published_parsed, '$[4]'), json_extract(published_parsed, '$[5]'))) AS INTEGER)
+                    WHERE published_parsed IS NOT NULL AND json_valid(published_parsed)
+                ''')
+            
+            # 创建索引（published 为各源原始格式的文本，排序意义不大，改用 published_ts 整数索引）
+            # 日期 + 排序列的窄覆盖索引：AI 分析按日期范围取最新 N 篇时，先只靠索引选出 id 再回表，
+            # 排序不必搬动 content 等大字段；以 collection_date 开头，同时取代原单列日期索引
+            cursor.execute('DROP INDEX IF EXISTS idx_articles_collection_date')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_date_sort ON news_articles(collection_date, published, created_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_source ON news_articles(source_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published ON news_articles(published)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_title ON news_articles(title)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_link ON news_articles(link)')
+            cursor.execute('DROP INDEX IF EXISTS idx_articles_published')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published_ts ON news_articles(published_ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_date_source ON news_articles(collection_date, source_id)')
+            # link 的 UNIQUE 约束自带索引；title 不作为查询条件，单列索引只会拖慢写入
+            cursor.execute('DROP INDEX IF EXISTS idx_articles_title')
+            cursor.execute('DROP INDEX IF EXISTS idx_articles_link')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_article ON news_tags(article_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_value ON news_tags(tag_value)')
             
-            # FTS5全文检索
+            # FTS5全文检索（外部内容表，不建逐行触发器，批量入库后统一 rebuild）
             try:
                 cursor.execute('''
                     CREATE VIRTUAL TABLE IF NOT EXISTS news_articles_fts USING fts5(
@@ -701,8 +1175,32 @@ class RSSAnalyzer:
             except Exception as e:
                 logger.debug(f"FTS5不可用: {e}")
         
+        self._db_initialized = True
         logger.debug("数据库表结构初始化完成")
     
+    def _rebuild_fts(self):
+        """批量入库后一次性重建FTS5索引（比逐行维护快得多）"""
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("INSERT INTO news_articles_fts(news_articles_fts) VALUES('rebuild')")
+            logger.debug("FTS索引重建完成")
+        except Exception as e:
+            logger.debug(f"FTS5不可用，跳过索引重建: {e}")
+    
+    def _load_known_links(self) -> set:
+        """加载已入库的文章链接（每次运行只查询一次）"""
+        if self._known_links is None:
+            self._init_database()
+            with self.db.get_connection(row_factory=False) as conn:
+                self._known_links = {row[0] for row in conn.execute("SELECT link FROM news_articles")}
+            logger.debug(f"已入库链接: {len(self._known_links)} 条")
+        return self._known_links
+    
+    def _new_entries(self, entries: List[Any]) -> List[Any]:
+        """过滤掉链接已入库的条目，旧文章不再抓取正文、组装插入行"""
+        known_links = self._load_known_links()
+        return [e for e in entries if self.normalize_link(e.get('link', 'N/A')) not in known_links]
+    
     def _get_source_map(self, rss_sources: dict) -> Dict[str, int]:
         """获取或创建来源映射"""
         source_data = [(name, url) for name, url in rss_sources.items()]
@@ -721,17 +1219,25 @@ class RSSAnalyzer:
         
         logger.debug(f"来源映射: {len(source_map)} 个来源")
         return source_map
-    
-    def __del__(self):
-        """析构时保存缓存"""
-        self._save_http_cache()
+
+
+def read_json_file(path: Path) -> Any:
+    """读取JSON文件（安装了 orjson 时直接解析字节，省去解码和 str 中间对象）"""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dump_json_bytes(obj: Any) -> bytes:
+    """将单个对象序列化为紧凑的UTF-8 JSON字节（非ASCII字符原样输出）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
 
 
 def load_rss_sources(config_path: Path) -> dict:
     """从配置文件加载RSS源"""
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = read_json_file(Path(config_path))
         
         # 扁平化分类结构
         rss_sources = {}
@@ -740,7 +1246,7 @@ def load_rss_sources(config_path: Path) -> dict:
                 rss_sources[source_name] = url
         
         return rss_sources
-        
+    
     except FileNotFoundError:
         print_error(f"配置文件未找到: {config_path}")
         return {}
@@ -749,6 +1255,19 @@ def load_rss_sources(config_path: Path) -> dict:
         return {}
 
 
+def count_entries(source_entries: SourceEntries) -> int:
+    """统计分组条目总数"""
+    return sum(len(entries) for _, entries in source_entries)
+
+
+def group_by_source(pairs: Iterable[Tuple[str, Any]]) -> SourceEntries:
+    """将 (来源名称, 条目) 序列重新按来源分组（保持原有顺序）"""
+    grouped: Dict[str, List[Any]] = {}
+    for source_name, entry in pairs:
+        grouped.setdefault(source_name, []).append(entry)
+    return list(grouped.items())
+
+
 def create_directory_structure(base_path: Path):
     """创建目录结构（仅创建必要的目录）"""
     # 只创建基础目录，其他目录在需要时按需创建
@@ -756,36 +1275,44 @@ def create_directory_structure(base_path: Path):
     logger.debug(f"目录结构创建: {base_path}")
 
 
-def export_to_json(entries: List[Any], output_dir: Path, stats: dict):
-    """导出数据到JSON（静默）"""
+def export_to_json(source_entries: SourceEntries, output_dir: Path, stats: dict):
+    """导出数据到JSON（静默，逐条流式写入，不在内存中构建完整文章列表）"""
     try:
         data_file = output_dir / "collected_data.json"
         
-        serialized_entries = []
-        for entry in entries:
-            serialized_entry = {
-                'title': entry.get('title', 'N/A'),
-                'link': entry.get('link', 'N/A'),
-                'published': entry.get('published', 'N/A'),
-                'summary': entry.get('summary', 'N/A'),
-                'source': getattr(entry, 'source', 'Unknown')
-            }
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                serialized_entry['published_parsed'] = list(entry.published_parsed)
-            serialized_entries.append(serialized_entry)
-        
-        data = {
+        header = {
             'collection_date': datetime.now().strftime('%Y-%m-%d'),
             'total_sources': stats.get('total', 0),
             'successful_sources': stats.get('success', 0),
             'failed_sources': stats.get('failed', 0),
-            'total_articles': len(serialized_entries),
-            'articles': serialized_entries
+            'total_articles': count_entries(source_entries)
         }
         
-        with open(data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
+        with open(data_file, 'wb', buffering=1 << 20) as f:
+            f.write(b'{\n')
+            for name, value in header.items():
+                f.write(b'  ' + dump_json_bytes(name) + b': ' + dump_json_bytes(value) + b',\n')
+            f.write(b'  "articles": [')
+            
+            # 每篇文章序列化为一行，逗号写在后续条目之前
+            first = True
+            for source_name, entries in source_entries:
+                for entry in entries:
+                    serialized_entry = {
+                        'title': entry.get('title', 'N/A'),
+                        'link': entry.get('link', 'N/A'),
+                        'published': entry.get('published', 'N/A'),
+                        'summary': entry.get('summary', 'N/A'),
+                        'source': source_name
+                    }
+                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                        serialized_entry['published_parsed'] = list(entry.published_parsed)
+                    f.write(b'\n    ' if first else b',\n    ')
+                    f.write(dump_json_bytes(serialized_entry))
+                    first = False
+            
+            f.write(b']\n}\n' if first else b'\n  ]\n}\n')
+    
     except Exception as e:
         logger.error(f"导出JSON失败: {e}")
 
@@ -796,8 +1323,12 @@ def main():
     parser.add_argument('--fetch-content', action='store_true', help='抓取正文')
     parser.add_argument('--content-max-length', type=int, default=0, help='正文最大长度')
     parser.add_argument('--only-source', type=str, help='仅抓取指定来源（逗号分隔）')
-    parser.add_argument('--max-workers', type=int, default=5, help='最大并发数')
+    parser.add_argument('--max-workers', type=int, default=5,
+                        help='线程池抓取的线程数（未安装 aiohttp 时使用；安装后由 --concurrency 控制）')
+    parser.add_argument('--concurrency', type=int, default=64, help='异步抓取的最大并发连接数（需安装 aiohttp）')
     parser.add_argument('--deduplicate', action='store_true', help='启用智能去重')
+    parser.add_argument('--dedup-links-only', action='store_true',
+                        help='去重时只合并相同链接，跳过标题相似度比较（需配合 --deduplicate）')
     args = parser.parse_args()
     
     print_header("财经新闻数据收集系统")
@@ -817,7 +1348,6 @@ def main():
     data_dir = project_root / "data"
     data_dir.mkdir(parents=True, exist_ok=True)
     db_path = data_dir / "news_data.db"
-    http_cache_path = data_dir / 'http_cache.json'
     
     # 加载RSS源
     rss_config_path = config.get_rss_sources_config()
@@ -841,78 +1371,111 @@ def main():
     print()
     
     # 创建分析器
-    analyzer = RSSAnalyzer(db_path, http_cache_path)
-    
-    # 并发抓取
-    all_entries = analyzer.fetch_all_sources_parallel(
-        rss_sources,
-        limit=5,
-        max_workers=args.max_workers
-    )
-    
-    if not all_entries:
-        print_warning("未获取到任何文章")
-        return 0
-    
-    print()
-    
-    # 智能去重（可选）
-    if args.deduplicate:
-        before_count = len(all_entries)
-        
-        # 转换为字典格式
-        articles_dict = [
-            {
-                'title': e.get('title', ''),
-                'link': e.get('link', ''),
-                'summary': e.get('summary', ''),
-                'source': getattr(e, 'source', ''),
-                '_original': e
-            }
-            for e in all_entries
-        ]
+    analyzer = RSSAnalyzer(db_path)
+    try:
+        # 安装了 aiohttp 时所有源在一个事件循环中并发抓取，再统一入库；
+        # 跨来源去重也需要先拿到全部条目。仅在两者都不满足时使用线程流水线
+        pipelined = not args.deduplicate and aiohttp is None
         
-        unique_articles, dedup_stats = deduplicate_items(
-            articles_dict,
-            threshold=0.85,
-            priority_keys=['summary']
-        )
+        if not pipelined:
+            all_entries = analyzer.fetch_all_sources_async(
+                rss_sources,
+                limit=5,
+                concurrency=args.concurrency,
+                max_workers=args.max_workers
+            )
+        else:
+            # 抓取线程与写入线程流水线并行
+            all_entries, inserted = analyzer.fetch_and_save_pipeline(
+                rss_sources,
+                today,
+                limit=5,
+                max_workers=args.max_workers,
+                fetch_content=args.fetch_content,
+                content_max_length=max(0, args.content_max_length)
+            )
         
-        # 恢复原始格式
-        all_entries = [a['_original'] for a in unique_articles]
+        if not all_entries:
+            print_warning("未获取到任何文章")
+            return 0
         
-        print(f"✓ 去重完成: {before_count} → {len(all_entries)} 篇（移除 {dedup_stats['removed']} 篇）")
         print()
+        
+        # 智能去重（可选）
+        if args.deduplicate:
+            before_count = count_entries(all_entries)
+        
+            # 跨来源去重：直接在 feedparser 条目上比较，不再复制为字典；
+            # 来源名称放在按相同下标对应的并行列表中，条目本身不携带来源
+            flat_entries = []
+            flat_sources = []
+            seen_links = set()
+            for source_name, entries in all_entries:
+                for e in entries:
+                    # 规范化后链接相同的条目直接丢弃（O(1)），不进入相似度比较
+                    link = analyzer.normalize_link(e.get('link', ''))
+                    if link and link in seen_links:
+                        continue
+                    seen_links.add(link)
+                    flat_entries.append(e)
+                    flat_sources.append(source_name)
+            logger.info(f"链接去重: {before_count} → {len(flat_entries)} 篇")
+        
+            if args.dedup_links_only:
+                logger.info("仅按链接去重，跳过标题相似度比较")
+                kept_indices = range(len(flat_entries))
+            else:
+                kept_indices, _ = deduplicate_indices(
+                    flat_entries,
+                    threshold=0.85,
+                    priority_keys=['summary']
+                )
+        
+            # 恢复按来源分组的格式
+            all_entries = group_by_source((flat_sources[i], flat_entries[i]) for i in kept_indices)
+        
+            after_count = count_entries(all_entries)
+            print(f"✓ 去重完成: {before_count} → {after_count} 篇（移除 {before_count - after_count} 篇）")
+            print()
+        
+        if not pipelined:
+            # 保存到数据库
+            inserted = analyzer.save_to_database(
+                all_entries,
+                today,
+                rss_sources,
+                fetch_content=args.fetch_content,
+                content_max_length=max(0, args.content_max_length),
+                max_workers=args.max_workers * 4
+            )
+        
+        # 导出JSON
+        export_to_json(all_entries, base_path, {
+            'total': len(rss_sources),
+            'success': len(rss_sources),
+            'failed': 0
+        })
+        
+        # 统计信息（整块拼好后一次输出）
+        print('\n'.join([
+            "",
+            "=" * 60,
+            "  📊 采集统计",
+            "=" * 60,
+            f"  日期: {today}",
+            f"  来源: {len(rss_sources)} 个RSS源",
+            f"  获取: {count_entries(all_entries)} 篇文章",
+            f"  入库: {inserted} 篇新文章",
+            f"  路径: {db_path}",
+            "=" * 60,
+        ]))
+        
+        return 0
     
-    # 保存到数据库
-    inserted = analyzer.save_to_database(
-        all_entries,
-        today,
-        rss_sources,
-        fetch_content=args.fetch_content,
-        content_max_length=max(0, args.content_max_length)
-    )
-    
-    # 导出JSON
-    export_to_json(all_entries, base_path, {
-        'total': len(rss_sources),
-        'success': len(rss_sources),
-        'failed': 0
-    })
-    
-    # 统计信息
-    print()
-    print("=" * 60)
-    print(f"  📊 采集统计")
-    print("=" * 60)
-    print(f"  日期: {today}")
-    print(f"  来源: {len(rss_sources)} 个RSS源")
-    print(f"  获取: {len(all_entries)} 篇文章")
-    print(f"  入库: {inserted} 篇新文章")
-    print(f"  路径: {db_path}")
-    print("=" * 60)
-    
-    return 0
+    finally:
+        # 关闭池中的持久连接：最后一个连接关闭时完成 WAL 检查点，
+        # 之后提交 news_data.db 时不会遗漏仍留在 -wal 文件中的数据
+        analyzer.db.close()
 
 
 if __name__ == "__main__":
@@ -25,9 +25,12 @@ import smtplib
 import sys
 import yaml
 import pytz
+from collections import namedtuple
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from functools import lru_cache
+from email import policy
+from email.message import EmailMessage
+from email.utils import parseaddr
 from pathlib import Path
 from typing import Dict, Optional
 
@@ -40,108 +43,21 @@ from scripts.utils.print_utils import print_header, print_success, print_error,
 
 logger = get_logger('notification')
 
+# 优先使用 libyaml 的 C 解析器，未编译 libyaml 时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
-def load_config() -> Dict:
-    """加载配置文件
-    
-    Returns:
-        配置字典
-    """
-    config_path = PROJECT_ROOT / 'config' / 'config.yml'
-    if not config_path.exists():
-        logger.debug('配置文件不存在，使用环境变量')
-        return {}
-    
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f) or {}
-        logger.debug(f'成功加载配置文件: {config_path}')
-        return config
-    except Exception as e:
-        logger.warning(f'加载配置文件失败: {e}')
-        return {}
 
-
-class NotificationSender:
-    """通知发送器"""
-    
-    def __init__(self, config: Dict):
-        """初始化
-        
-        Args:
-            config: 配置字典，包含status信息和SMTP配置
-        """
-        self.config = config
-        # 使用北京时间
-        import pytz
-        beijing_tz = pytz.timezone('Asia/Shanghai')
-        beijing_time = datetime.now(beijing_tz)
-        self.today = beijing_time.strftime('%Y-%m-%d')
-        self.timestamp = beijing_time.strftime('%Y年%m月%d日 %H:%M:%S')
-    
-    def get_status_emoji(self, status: str) -> str:
-        """获取状态对应的emoji"""
-        status_map = {
-            'success': '✅',
-            'failure': '❌',
-            'skipped': '⏭️',
-            'cancelled': '🚫'
-        }
-        return status_map.get(status, '❓')
-    
-    def get_status_text(self, status: str) -> str:
-        """获取状态文本"""
-        status_map = {
-            'success': '成功',
-            'failure': '失败',
-            'skipped': '跳过',
-            'cancelled': '取消'
-        }
-        return status_map.get(status, '未知')
-    
-    def get_overall_status(self) -> tuple:
-        """判断整体状态
-        
-        Returns:
-            (emoji, text) 元组
-        """
-        fetch = self.config['fetch_status']
-        analysis = self.config['analysis_status']
-        deploy = self.config['deploy_status']
-        
-        if fetch == 'success' and analysis == 'success' and deploy == 'success':
-            return '✅', '全部成功'
-        elif fetch == 'failure' or analysis == 'failure' or deploy == 'failure':
-            return '❌', '部分失败'
-        else:
-            return '⚠️', '部分跳过'
-    
-    def generate_html_email(self) -> str:
-        """生成HTML邮件内容"""
-        overall_emoji, overall_text = self.get_overall_status()
-        
-        fetch_emoji = self.get_status_emoji(self.config['fetch_status'])
-        fetch_text = self.get_status_text(self.config['fetch_status'])
-        
-        analysis_emoji = self.get_status_emoji(self.config['analysis_status'])
-        analysis_text = self.get_status_text(self.config['analysis_status'])
-        
-        deploy_emoji = self.get_status_emoji(self.config['deploy_status'])
-        deploy_text = self.get_status_text(self.config['deploy_status'])
-        
-        news_count = self.config.get('news_count', 0)
-        trigger_text = '⏰ 定时任务' if self.config.get('trigger') == 'schedule' else '🖱️ 手动触发'
-        
-        website_url = self.config.get('website_url', '#')
-        run_url = self.config.get('run_url', '#')
-        
-        html = f"""
+# HTML邮件模板（模块加载时构建一次，发送时只做 format_map 填充；CSS 花括号已转义）
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>财经报告 - {self.today}</title>
+    <title>财经报告 - {today}</title>
     <style>
         * {{
             margin: 0;
@@ -182,7 +98,7 @@ class NotificationSender:
         }}
         .status-overview {{
             background: #f8f9fa;
-            border-left: 4px solid {('#28a745' if overall_emoji == '✅' else '#ffc107' if overall_emoji == '⚠️' else '#dc3545')};
+            border-left: 4px solid {border_color};
             padding: 15px 20px;
             margin-bottom: 25px;
             border-radius: 4px;
@@ -303,7 +219,7 @@ class NotificationSender:
     <div class="email-container">
         <div class="header">
             <h1>{overall_emoji} 每日财经报告</h1>
-            <div class="date">{self.timestamp}</div>
+            <div class="date">{timestamp}</div>
         </div>
         
         <div class="content">
@@ -357,32 +273,230 @@ class NotificationSender:
         
         <div class="footer">
             <p><strong>此邮件由 GitHub Actions 自动发送</strong></p>
-            <p>仓库: {self.config.get('repository', 'N/A')} | 分支: {self.config.get('branch', 'main')}</p>
+            <p>仓库: {repository} | 分支: {branch}</p>
             <p style="margin-top: 10px; color: #999;">请勿直接回复此邮件</p>
         </div>
     </div>
 </body>
 </html>
-"""
-        return html.strip()
+""".strip()
+
+# 一次发送中各格式正文共用的状态信息（整体状态及三个阶段的 emoji/文本）
+StatusCtx = namedtuple('StatusCtx', [
+    'overall_emoji', 'overall_text',
+    'fetch_emoji', 'fetch_text',
+    'analysis_emoji', 'analysis_text',
+    'deploy_emoji', 'deploy_text',
+])
+
+# 整体状态对应的左边框颜色（未列出的状态使用红色）
+_BORDER_COLORS = {
+    '✅': '#28a745',
+    '⚠️': '#ffc107',
+}
+
+
+@lru_cache(maxsize=1)
+def load_config() -> Dict:
+    """加载配置文件（进程内只解析一次，返回的字典请勿修改）
     
-    def generate_text_email(self) -> str:
-        """生成纯文本邮件内容（作为HTML的备选）"""
+    Returns:
+        配置字典
+    """
+    config_path = PROJECT_ROOT / 'config' / 'config.yml'
+    if not config_path.exists():
+        logger.debug('配置文件不存在，使用环境变量')
+        return {}
+    
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.load(f, Loader=YamlLoader) or {}
+        logger.debug(f'成功加载配置文件: {config_path}')
+        return config
+    except Exception as e:
+        logger.warning(f'加载配置文件失败: {e}')
+        return {}
+
+
+class NotificationSender:
+    """通知发送器
+    
+    可作为上下文管理器使用：SMTP连接在第一次发送邮件时建立并登录，
+    之后的邮件复用同一连接，退出时统一断开。
+    """
+    
+    # 状态对应的emoji和文本
+    _STATUS_EMOJI = {
+        'success': '✅',
+        'failure': '❌',
+        'skipped': '⏭️',
+        'cancelled': '🚫'
+    }
+    _STATUS_TEXT = {
+        'success': '成功',
+        'failure': '失败',
+        'skipped': '跳过',
+        'cancelled': '取消'
+    }
+    
+    def __init__(self, config: Dict):
+        """初始化
+        
+        Args:
+            config: 配置字典，包含status信息和SMTP配置
+        """
+        self.config = config
+        # 使用北京时间
+        import pytz
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        beijing_time = datetime.now(beijing_tz)
+        self.today = beijing_time.strftime('%Y-%m-%d')
+        self.timestamp = beijing_time.strftime('%Y年%m月%d日 %H:%M:%S')
+        self.rfc2822_date = beijing_time.strftime('%a, %d %b %Y %H:%M:%S +0800')
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def __enter__(self) -> 'NotificationSender':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def close(self):
+        """断开SMTP连接（如已建立）"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+    
+    def _get_smtp(self, smtp_server: str, smtp_port: int, username: str, password: str) -> smtplib.SMTP:
+        """获取已登录的SMTP连接，首次调用时建立连接"""
+        if self._smtp is not None:
+            return self._smtp
+        
+        print_info(f'连接SMTP服务器: {smtp_server}:{smtp_port}')
+        
+        # QQ邮箱使用SSL连接（端口465）或TLS连接（端口587）
+        if smtp_port == 465:
+            # 使用SSL连接
+            print_info('使用SSL加密连接...')
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
+        else:
+            # 使用TLS连接（587端口）
+            print_info('使用TLS加密连接...')
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
+        
+        try:
+            if smtp_port != 465:
+                server.starttls()
+            
+            print_info('登录邮箱服务器...')
+            server.login(username, password)
+        except Exception:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def get_status_emoji(self, status: str) -> str:
+        """获取状态对应的emoji"""
+        return self._STATUS_EMOJI.get(status, '❓')
+    
+    def get_status_text(self, status: str) -> str:
+        """获取状态文本"""
+        return self._STATUS_TEXT.get(status, '未知')
+    
+    def get_overall_status(self) -> tuple:
+        """判断整体状态
+        
+        Returns:
+            (emoji, text) 元组
+        """
+        fetch = self.config['fetch_status']
+        analysis = self.config['analysis_status']
+        deploy = self.config['deploy_status']
+        
+        if fetch == 'success' and analysis == 'success' and deploy == 'success':
+            return '✅', '全部成功'
+        elif fetch == 'failure' or analysis == 'failure' or deploy == 'failure':
+            return '❌', '部分失败'
+        else:
+            return '⚠️', '部分跳过'
+    
+    def build_status_ctx(self) -> StatusCtx:
+        """计算本次通知的状态信息（HTML与纯文本正文共用）"""
         overall_emoji, overall_text = self.get_overall_status()
         
+        status_emoji = self._STATUS_EMOJI
+        status_text = self._STATUS_TEXT
+        fetch_status = self.config['fetch_status']
+        analysis_status = self.config['analysis_status']
+        deploy_status = self.config['deploy_status']
+        
+        return StatusCtx(
+            overall_emoji=overall_emoji,
+            overall_text=overall_text,
+            fetch_emoji=status_emoji.get(fetch_status, '❓'),
+            fetch_text=status_text.get(fetch_status, '未知'),
+            analysis_emoji=status_emoji.get(analysis_status, '❓'),
+            analysis_text=status_text.get(analysis_status, '未知'),
+            deploy_emoji=status_emoji.get(deploy_status, '❓'),
+            deploy_text=status_text.get(deploy_status, '未知'),
+        )
+    
+    def generate_html_email(self, status: Optional[StatusCtx] = None) -> str:
+        """生成HTML邮件内容（status 为预先计算的状态信息，缺省时现场计算）"""
+        if status is None:
+            status = self.build_status_ctx()
+        
+        news_count = self.config.get('news_count', 0)
+        trigger_text = '⏰ 定时任务' if self.config.get('trigger') == 'schedule' else '🖱️ 手动触发'
+        
+        website_url = self.config.get('website_url', '#')
+        run_url = self.config.get('run_url', '#')
+        
+        ctx = {
+            'today': self.today,
+            'timestamp': self.timestamp,
+            'overall_emoji': status.overall_emoji,
+            'overall_text': status.overall_text,
+            'border_color': _BORDER_COLORS.get(status.overall_emoji, '#dc3545'),
+            'fetch_emoji': status.fetch_emoji,
+            'fetch_text': status.fetch_text,
+            'analysis_emoji': status.analysis_emoji,
+            'analysis_text': status.analysis_text,
+            'deploy_emoji': status.deploy_emoji,
+            'deploy_text': status.deploy_text,
+            'news_count': news_count,
+            'trigger_text': trigger_text,
+            'website_url': website_url,
+            'run_url': run_url,
+            'repository': self.config.get('repository', 'N/A'),
+            'branch': self.config.get('branch', 'main'),
+        }
+        return _HTML_TEMPLATE.format_map(ctx)
+    
+    def generate_text_email(self, status: Optional[StatusCtx] = None) -> str:
+        """生成纯文本邮件内容（作为HTML的备选）"""
+        if status is None:
+            status = self.build_status_ctx()
+        
         text = f"""
 {'='*50}
   每日财经报告 - {self.today}
 {'='*50}
 
-整体状态: {overall_text}
+整体状态: {status.overall_text}
 执行时间: {self.timestamp}
 
 【执行状态】
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-  📰 数据抓取: {self.get_status_text(self.config['fetch_status'])}
-  🤖 AI分析:   {self.get_status_text(self.config['analysis_status'])}
-  🚀 网站部署: {self.get_status_text(self.config['deploy_status'])}
+  📰 数据抓取: {status.fetch_text}
+  🤖 AI分析:   {status.analysis_text}
+  🚀 网站部署: {status.deploy_text}
 
 【数据统计】
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -448,61 +562,50 @@ class NotificationSender:
             config_source = '配置文件' if email_config else '环境变量'
             print_info(f'📝 使用{config_source}中的邮件配置')
             
-            # 生成邮件内容
-            overall_emoji, _ = self.get_overall_status()
-            subject = f"{overall_emoji} 财经报告 - {self.today}"
-            html_body = self.generate_html_email()
-            text_body = self.generate_text_email()
+            # 生成邮件内容（状态信息只计算一次；纯文本备选可通过 include_text_alternative 关闭）
+            status = self.build_status_ctx()
+            subject = f"{status.overall_emoji} 财经报告 - {self.today}"
+            html_body = self.generate_html_email(status)
+            include_text = email_config.get('include_text_alternative', True)
+            text_body = self.generate_text_email(status) if include_text else None
+            
+            # 获取连接（复用已登录的连接）
+            server = self._get_smtp(smtp_server, smtp_port, username, password)
+            
+            # 服务器支持 8BITMIME 时中文正文按 UTF-8 原样传输，否则退回 base64/QP 编码
+            supports_8bit = server.has_extn('8bitmime')
+            mail_policy = policy.SMTP if supports_8bit else policy.SMTP.clone(cte_type='7bit')
             
             # 创建邮件
-            msg = MIMEMultipart('alternative')
+            msg = EmailMessage(policy=mail_policy)
             msg['Subject'] = subject
             # QQ邮箱要求From必须和登录用户名一致
             msg['From'] = username if '@' in username else from_email
             msg['To'] = to_email
-            # 使用北京时间
-            beijing_tz = pytz.timezone('Asia/Shanghai')
-            beijing_time = datetime.now(beijing_tz)
-            msg['Date'] = beijing_time.strftime('%a, %d %b %Y %H:%M:%S +0800')
+            # 使用北京时间（与正文中的执行时间一致，初始化时已计算）
+            msg['Date'] = self.rfc2822_date
             
-            # 添加纯文本和HTML版本
-            msg.attach(MIMEText(text_body, 'plain', 'utf-8'))
-            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+            # 添加纯文本和HTML版本（HTML在后，客户端优先显示）
+            if text_body is not None:
+                msg.set_content(text_body)
+                msg.add_alternative(html_body, subtype='html')
+            else:
+                msg.set_content(html_body, subtype='html')
             
-            # 发送邮件
-            print_info(f'连接SMTP服务器: {smtp_server}:{smtp_port}')
+            # 邮件只序列化一次，信封收件人列表决定投递对象
+            print_info(f'发送邮件给 {len(to_emails)} 个收件人...')
+            server.sendmail(
+                parseaddr(msg['From'])[1], to_emails, msg.as_bytes(),
+                mail_options=['BODY=8BITMIME'] if supports_8bit else []
+            )
             
-            server = None
-            try:
-                # QQ邮箱使用SSL连接（端口465）或TLS连接（端口587）
-                if smtp_port == 465:
-                    # 使用SSL连接
-                    print_info('使用SSL加密连接...')
-                    server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
-                else:
-                    # 使用TLS连接（587端口）
-                    print_info('使用TLS加密连接...')
-                    server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
-                    server.starttls()
-                
-                print_info('登录邮箱服务器...')
-                server.login(username, password)
-                
-                print_info(f'发送邮件给 {len(to_emails)} 个收件人...')
-                server.send_message(msg)
-                
-                print_success(f'✅ 邮件发送成功: {to_email}')
-                logger.info(f'Email sent to {len(to_emails)} recipient(s): {to_email}')
-                return True
-                
-            finally:
-                if server:
-                    try:
-                        server.quit()
-                    except:
-                        pass
+            print_success(f'✅ 邮件发送成功: {to_email}')
+            logger.info(f'Email sent to {len(to_emails)} recipient(s): {to_email}')
+            return True
             
         except Exception as e:
+            # 连接可能已失效，断开后下次发送重新建立
+            self.close()
             print_error(f'❌ 邮件发送失败: {e}')
             logger.error(f'Failed to send email: {e}', exc_info=True)
             return False
@@ -602,26 +705,24 @@ def main():
         'branch': args.branch,
     }
     
-    # 创建通知发送器
-    sender = NotificationSender(config)
-    
-    # 发送通知
+    # 创建通知发送器并发送通知（退出时断开SMTP连接）
     success_count = 0
-    for channel in args.channels:
-        print_info(f'\n📤 发送 {channel} 通知...')
-        
-        if channel == 'email':
-            if sender.send_email():
-                success_count += 1
-        elif channel == 'wechat':
-            if sender.send_wechat():
-                success_count += 1
-        elif channel == 'dingtalk':
-            if sender.send_dingtalk():
-                success_count += 1
-        elif channel == 'telegram':
-            if sender.send_telegram():
-                success_count += 1
+    with NotificationSender(config) as sender:
+        for channel in args.channels:
+            print_info(f'\n📤 发送 {channel} 通知...')
+            
+            if channel == 'email':
+                if sender.send_email():
+                    success_count += 1
+            elif channel == 'wechat':
+                if sender.send_wechat():
+                    success_count += 1
+            elif channel == 'dingtalk':
+                if sender.send_dingtalk():
+                    success_count += 1
+            elif channel == 'telegram':
+                if sender.send_telegram():
+                    success_count += 1
     
     # 汇总结果
     print()
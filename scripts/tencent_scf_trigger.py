@@ -10,32 +10,92 @@
 3. 设置定时触发器（Cron 表达式）
 
 注意：
-- 使用 Python 内置库 urllib，无需安装额外依赖
+- 使用 Python 内置库 http.client，无需安装额外依赖
 - 腾讯云函数已验证可用
+- HTTPS 连接在模块级复用，热启动时同一容器内的后续调用省去 TCP+TLS 握手
 """
 
 import os
 import json
-from urllib import request, error
-from urllib.request import HTTPRedirectHandler
+import select
+import http.client
+from urllib.parse import urljoin, urlsplit
 from datetime import datetime
 
 
-class HTTPPostRedirectHandler(HTTPRedirectHandler):
-    """处理 POST 请求的重定向
+# 按主机缓存的 HTTPS 长连接（容器存活期间跨调用复用）
+_CONNECTIONS = {}
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+def _get_connection(host, timeout):
+    """获取指定主机的复用连接，不存在时新建
     
-    GitHub API 可能返回 307 重定向，需要保持 POST 方法和数据
+    空闲连接在复用前检查一次：服务端已关闭的连接在本端表现为可读（EOF），
+    直接丢弃重建，避免把请求发到失效的连接上
+    
+    Returns:
+        (连接, 是否为缓存中复用的已建立连接)
     """
-    def redirect_request(self, req, fp, code, msg, headers, newurl):
-        if code in [301, 302, 303, 307, 308]:
-            # 保持原始请求的 method、data 和 headers
-            return request.Request(
-                newurl,
-                data=req.data,
-                headers=req.headers,
-                method=req.get_method()
-            )
-        return None
+    conn = _CONNECTIONS.get(host)
+    if conn is not None and conn.sock is not None:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+        if not readable:
+            return conn, True
+        _drop_connection(host)
+        conn = None
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=timeout)
+        _CONNECTIONS[host] = conn
+    return conn, False
+
+
+def _drop_connection(host):
+    """关闭并丢弃指定主机的连接，下次请求时重新建立"""
+    conn = _CONNECTIONS.pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+def post(url, body, headers, timeout=10, max_redirects=5):
+    """通过复用的 HTTPS 连接发送 POST 请求
+    
+    GitHub API 可能返回 307 重定向，重定向时保持 POST 方法和数据
+    
+    Returns:
+        (状态码, 原因, 响应体字节)
+    """
+    for _ in range(max_redirects + 1):
+        parts = urlsplit(url)
+        path = parts.path + ('?' + parts.query if parts.query else '')
+        
+        for attempt in range(2):
+            conn, reused = _get_connection(parts.netloc, timeout)
+            sent = False
+            try:
+                conn.request('POST', path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                data = response.read()  # 读完响应体，连接才能继续复用
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                _drop_connection(parts.netloc)
+                # workflow_dispatch 不是幂等操作：只有复用的旧连接在发送阶段就失效时
+                # 才能确定服务端没收到请求，重建连接重试一次；其余情况一律上抛
+                if attempt or not reused or sent:
+                    raise
+            except Exception:
+                _drop_connection(parts.netloc)
+                raise
+        
+        location = response.getheader('Location')
+        if response.status in REDIRECT_CODES and location:
+            url = urljoin(url, location)
+            continue
+        return response.status, response.reason, data
+    
+    raise http.client.HTTPException(f"重定向次数过多: {url}")
 
 
 def main_handler(event, context):
@@ -49,10 +109,16 @@ def main_handler(event, context):
     Returns:
         dict: 执行结果
     """
-    print("=" * 60)
-    print("🚀 腾讯云函数触发器启动")
-    print(f"⏰ 触发时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
+    # 触发时间只取一次，日志与返回结果共用
+    now = datetime.now()
+    
+    # 日志按块输出，减少云函数日志的写入次数
+    print("\n".join([
+        "=" * 60,
+        "🚀 腾讯云函数触发器启动",
+        f"⏰ 触发时间: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        "=" * 60,
+    ]))
     
     # 从环境变量获取配置
     github_token = os.environ.get('GITHUB_TOKEN')
@@ -76,8 +142,7 @@ def main_handler(event, context):
             'body': json.dumps({'error': error_msg}, ensure_ascii=False)
         }
     
-    print(f"📦 仓库: {github_repo}")
-    print(f"📄 工作流: {workflow_id}")
+    print(f"📦 仓库: {github_repo}\n📄 工作流: {workflow_id}")
     
     # 构建 GitHub API 请求
     api_url = f"https://api.github.com/repos/{github_repo}/actions/workflows/{workflow_id}/dispatches"
@@ -101,73 +166,47 @@ def main_handler(event, context):
     payload_encoded = json.dumps(payload, ensure_ascii=False).encode('utf-8')
     
     try:
-        print(f"📡 发送请求到: {api_url}")
-        print(f"📋 请求体: {json.dumps(payload, indent=2, ensure_ascii=False)}")
-        
-        # 使用自定义重定向处理器
-        opener = request.build_opener(HTTPPostRedirectHandler())
-        request.install_opener(opener)
+        print(f"📡 发送请求到: {api_url}\n📋 请求体: {json.dumps(payload, indent=2, ensure_ascii=False)}")
         
-        req = request.Request(api_url, data=payload_encoded, headers=headers, method='POST')
-        response = request.urlopen(req, timeout=10)
-        status = response.status
+        status, reason, response_body = post(api_url, payload_encoded, headers, timeout=10)
         
         print(f"📊 响应状态码: {status}")
         
         if status == 204 or status == 200:
             success_msg = "✅ 成功触发 GitHub Actions!"
-            print(success_msg)
-            print(f"🔗 查看工作流: https://github.com/{github_repo}/actions")
+            print(f"{success_msg}\n🔗 查看工作流: https://github.com/{github_repo}/actions")
             
             return {
                 'statusCode': 200,
                 'body': json.dumps({
                     'message': success_msg,
-                    'trigger_time': datetime.now().isoformat(),
+                    'trigger_time': now.isoformat(),
                     'repo': github_repo,
                     'workflow': workflow_id
                 }, ensure_ascii=False)
             }
-        else:
-            error_msg = f"⚠️ 意外状态码: {status}"
+        elif status >= 400:
+            error_msg = f"❌ HTTP 错误: {status} - {reason}"
             print(error_msg)
+            if response_body:
+                print(f"📄 错误详情: {response_body.decode('utf-8', errors='replace')}")
             return {
                 'statusCode': status,
-                'body': json.dumps({'message': error_msg}, ensure_ascii=False)
-            }
-    
-    except error.HTTPError as e:
-        # GitHub API 的 204 响应可能被当作错误处理
-        if e.code == 204:
-            success_msg = "✅ 成功触发 GitHub Actions (204)!"
-            print(success_msg)
-            print(f"🔗 查看工作流: https://github.com/{github_repo}/actions")
-            return {
-                'statusCode': 200,
                 'body': json.dumps({
-                    'message': success_msg,
-                    'trigger_time': datetime.now().isoformat()
+                    'error': error_msg,
+                    'code': status
                 }, ensure_ascii=False)
             }
         else:
-            error_msg = f"❌ HTTP 错误: {e.code} - {e.reason}"
+            error_msg = f"⚠️ 意外状态码: {status}"
             print(error_msg)
-            # 尝试读取错误详情
-            try:
-                error_body = e.read().decode('utf-8')
-                print(f"📄 错误详情: {error_body}")
-            except:
-                pass
             return {
-                'statusCode': e.code,
-                'body': json.dumps({
-                    'error': error_msg,
-                    'code': e.code
-                }, ensure_ascii=False)
+                'statusCode': status,
+                'body': json.dumps({'message': error_msg}, ensure_ascii=False)
             }
     
-    except error.URLError as e:
-        error_msg = f"⏱️ 网络错误: {str(e.reason)}"
+    except (OSError, http.client.HTTPException) as e:
+        error_msg = f"⏱️ 网络错误: {str(e)}"
         print(error_msg)
         return {
             'statusCode': 408,
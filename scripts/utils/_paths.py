@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目路径常量
+
+项目根目录只在此处解析一次，utils 下各模块共用，避免各自重复 resolve()
+"""
+
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
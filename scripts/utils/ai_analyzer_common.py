@@ -7,21 +7,47 @@ AI 分析公共模块
 """
 
 import json
+import re
 import sqlite3
+import sys
+from bisect import bisect_right
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Callable, FrozenSet, Iterator, Optional, Tuple
 
 import pytz
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from utils.print_utils import (
     print_success, print_warning, print_info
 )
 
+from ._paths import PROJECT_ROOT
+
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / 'data' / 'news_data.db'
 
+# 北京时区只解析一次，各处取当前时间时复用
+BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+
+# 查询结果分批读取的行数
+QUERY_BATCH_SIZE = 4096
+
+# 分析流程只读数据库：开启内存映射和较大的页缓存，并禁止写入
+READ_PRAGMAS = (
+    'PRAGMA query_only=1',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',  # 256MB
+    'PRAGMA cache_size=-65536',    # 64MB
+)
+
 
 def validate_date(date_str: str) -> str:
     """验证日期格式"""
@@ -37,151 +63,207 @@ def open_connection(db_path: Path) -> sqlite3.Connection:
     if not db_path.exists():
         raise SystemExit(f'数据库不存在: {db_path}')
     conn = sqlite3.connect(db_path)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def build_query(order: str, limit: int) -> Tuple[str, List[Any]]:
-    """构建SQL查询"""
+@lru_cache(maxsize=None)
+def _select_sql(order_dir: str, has_limit: bool) -> str:
+    """按 (排序方向, 是否限制条数) 缓存查询语句
+
+    每种组合只拼接一次，且每次返回同一个字符串对象，
+    sqlite3 连接的语句缓存据此直接复用已编译的语句，跳过重复的解析与规划。
+    带 LIMIT 时先用子查询在覆盖索引 idx_articles_date_sort 上选出 id，
+    只对入选的行回表读取 content 等大字段，而不是整行排序后再截断。
+    """
+    order_by = 'ORDER BY COALESCE(a.published, a.created_at) ' + order_dir
     sql = [
         'SELECT a.id, a.collection_date, a.title, a.link, a.published, a.summary, a.content, s.source_name',
         'FROM news_articles a',
         'JOIN rss_sources s ON a.source_id = s.id',
-        'WHERE a.collection_date BETWEEN ? AND ?'
     ]
-    params: List[Any] = []
-
-    order_dir = 'DESC' if order.lower() == 'desc' else 'ASC'
-    sql.append('ORDER BY COALESCE(a.published, a.created_at) ' + order_dir)
+    if has_limit:
+        sql += [
+            'WHERE a.id IN (',
+            '    SELECT id FROM news_articles',
+            '    WHERE collection_date BETWEEN ? AND ?',
+            '    ORDER BY COALESCE(published, created_at) ' + order_dir,
+            '    LIMIT ?',
+            ')',
+        ]
+    else:
+        sql.append('WHERE a.collection_date BETWEEN ? AND ?')
+    sql.append(order_by)
+    return '\n'.join(sql)
 
-    if limit and limit > 0:
-        sql.append('LIMIT ?')
-        params.append(limit)
 
-    return '\n'.join(sql), params
+def build_query(order: str, limit: int) -> Tuple[str, List[Any]]:
+    """构建SQL查询"""
+    order_dir = 'DESC' if order.lower() == 'desc' else 'ASC'
+    has_limit = bool(limit and limit > 0)
+    params: List[Any] = [limit] if has_limit else []
+    return _select_sql(order_dir, has_limit), params
 
 
 def query_articles(conn: sqlite3.Connection, start: str, end: str, order: str, limit: int) -> List[Dict[str, Any]]:
     """查询文章"""
     sql, tail = build_query(order, limit)
     params = [start, end] + tail
-    cur = conn.execute(sql, params)
-    rows = cur.fetchall()
+    # 本查询按列位置取值，游标改用普通元组行，避免 sqlite3.Row 的按名查找
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, params)
     results: List[Dict[str, Any]] = []
-    for r in rows:
-        results.append({
-            'id': r['id'],
-            'collection_date': r['collection_date'],
-            'title': r['title'],
-            'link': r['link'],
-            'source': r['source_name'],
-            'published': r['published'],
-            'summary': r['summary'],
-            'content': r['content']
-        })
+    intern = sys.intern
+    # 日期与来源名在各行间大量重复，驻留后所有结果共享同一个字符串对象
+    while True:
+        batch = cur.fetchmany(QUERY_BATCH_SIZE)
+        if not batch:
+            break
+        results.extend({
+            'id': r[0],
+            'collection_date': intern(r[1]),
+            'title': r[2],
+            'link': r[3],
+            'source': intern(r[7]),
+            'published': r[4],
+            'summary': r[5],
+            'content': r[6]
+        } for r in batch)
+    cur.close()
     return results
 
 
-def chunk_text(text: str, max_chars: int = 4000) -> List[str]:
-    """文本分块"""
+def _chunk_ranges(text: str, max_chars: int) -> Iterator[Tuple[int, int]]:
+    """按块大小逐个产出分块的 (起点, 终点) 下标，优先在段落空行处断开"""
     if not text:
-        return []
+        return
+    n = len(text)
     if max_chars <= 0:
-        return [text]
-    chunks: List[str] = []
+        yield 0, n
+        return
+    # 一次正向扫描记下所有段落空行位置，之后每块用二分查找断点，不再反复回扫窗口
+    breaks: List[int] = []
+    i = text.find('\n\n')
+    while i != -1:
+        breaks.append(i)
+        i = text.find('\n\n', i + 1)
+    min_gap = int(max_chars * 0.5)
     start = 0
-    n = len(text)
     while start < n:
         end = min(n, start + max_chars)
-        boundary = text.rfind('\n\n', start, end)
-        if boundary == -1 or boundary <= start + int(max_chars * 0.5):
+        # 窗口内最后一个完整的 '\n\n'（起点不超过 end - 2）
+        idx = bisect_right(breaks, end - 2) - 1
+        if idx >= 0 and breaks[idx] > start + min_gap:
+            boundary = breaks[idx]
+        else:
             boundary = end
-        chunks.append(text[start:boundary])
+        yield start, boundary
         start = boundary
-    return chunks
+
+
+def chunk_text(text: str, max_chars: int = 4000) -> List[str]:
+    """文本分块"""
+    return [text[s:e] for s, e in _chunk_ranges(text, max_chars)]
 
 
 def build_corpus(articles: List[Dict[str, Any]], max_chars: int, per_chunk_chars: int = 3000, content_field: str = 'auto') -> Tuple[List[Tuple[Dict[str, Any], List[str]]], int]:
-    """构造分块语料"""
+    """构造分块语料
+
+    设置了 max_chars 时边分块边累计长度，预算用完后不再为后续文章分块和拼接文本，
+    只统计其长度（total_len 仍为全部文章的总长度）。
+    """
     pairs: List[Tuple[Dict[str, Any], List[str]]] = []
     total_len = 0
+    budget = max_chars if max_chars and max_chars > 0 else 0
+    acc = 0
+    exhausted = False
     for a in articles:
+        # 每个字段只取一次；数据库中的 NULL 统一按空串处理
+        summary = a.get('summary') or ''
+        content = a.get('content') or ''
         if content_field == 'summary':
-            body = a.get('summary') or a.get('content') or ''
+            body = summary or content
         elif content_field == 'content':
-            body = a.get('content') or a.get('summary') or ''
+            body = content or summary
         else:  # auto
-            summary = a.get('summary', '')
-            content = a.get('content', '')
             if len(content) > 5000 and summary:
                 body = summary
             else:
-                body = content or summary or ''
+                body = content or summary
 
         title = a.get('title') or ''
         source = a.get('source') or ''
         published = a.get('published') or ''
         link = a.get('link') or ''
-        header = f"【{title}】\n来源: {source} | 时间: {published}\n链接: {link}\n"
-        text = header + body
+        # 标题头与正文一次拼接，不再先生成中间的 header 字符串
+        parts = ('【', title, '】\n来源: ', source, ' | 时间: ', published, '\n链接: ', link, '\n', body)
+        if exhausted:
+            total_len += sum(map(len, parts))
+            continue
+
+        text = ''.join(parts)
         total_len += len(text)
-        chunks = chunk_text(text, per_chunk_chars)
-        pairs.append((a, chunks))
-
-    if max_chars and max_chars > 0:
-        acc = 0
-        trimmed: List[Tuple[Dict[str, Any], List[str]]] = []
-        for meta, chunks in pairs:
-            kept: List[str] = []
-            for c in chunks:
-                if acc + len(c) <= max_chars:
-                    kept.append(c)
-                    acc += len(c)
-                else:
-                    break
-            if kept:
-                trimmed.append((meta, kept))
-            if acc >= max_chars:
+        if not budget:
+            pairs.append((a, chunk_text(text, per_chunk_chars)))
+            continue
+
+        # 只切出预算内保留的分块
+        kept: List[str] = []
+        for s, e in _chunk_ranges(text, per_chunk_chars):
+            if acc + (e - s) > budget:
                 break
-        return trimmed, total_len
+            kept.append(text[s:e])
+            acc += e - s
+        if kept:
+            pairs.append((a, kept))
+        if acc >= budget:
+            exhausted = True
+
     return pairs, total_len
 
 
+# 来源名称别名映射与统计块中单独列出的来源
+SOURCE_NAME_MAPPING = {
+    '东方财富网': '东方财富',
+    '国家统计局-最新发布': '国家统计局',
+    '中新社': '中新网',
+    '中国新闻网': '中新网',
+    'Wall Street CN': '华尔街见闻',
+    'WallstreetCN': '华尔街见闻',
+}
+TRACKED_SOURCES = ('华尔街见闻', '36氪', '东方财富', '国家统计局', '中新网')
+
+
 def _normalize_source_name(name: str) -> str:
     """规范化来源名称"""
     if not name:
         return '未知来源'
     name = name.strip()
-    mapping = {
-        '东方财富网': '东方财富',
-        '国家统计局-最新发布': '国家统计局',
-        '中新社': '中新网',
-        '中国新闻网': '中新网',
-        'Wall Street CN': '华尔街见闻',
-        'WallstreetCN': '华尔街见闻',
-    }
-    return mapping.get(name, name)
+    return SOURCE_NAME_MAPPING.get(name, name)
 
 
 def build_source_stats_block(selected: List[Dict[str, Any]], content_field: str, start: str, end: str) -> str:
     """构建数据统计信息块"""
-    tracked = ['华尔街见闻', '36氪', '东方财富', '国家统计局', '中新网']
+    tracked = TRACKED_SOURCES
     counters: Dict[str, int] = {k: 0 for k in tracked}
     other_count = 0
 
-    for article in selected:
-        raw = (article.get('source') or '').strip()
-        norm = _normalize_source_name(raw)
+    # 先按原始来源名计数，每个不同的来源名只规范化一次
+    for raw, count in Counter(article.get('source') or '' for article in selected).items():
+        norm = _normalize_source_name(raw.strip())
         if norm in counters:
-            counters[norm] += 1
+            counters[norm] += count
         else:
-            other_count += 1
+            other_count += count
 
     total_articles = len(selected)
     content_articles = sum(1 for a in selected if a.get('content'))
     content_ratio = (content_articles / total_articles * 100) if total_articles > 0 else 0
 
-    stats_info = f"""
+    parts = [f"""
 === 数据统计信息 ===
 分析日期范围: {start} 至 {end}
 处理文章总数: {total_articles}篇
@@ -190,12 +272,19 @@ def build_source_stats_block(selected: List[Dict[str, Any]], content_field: str,
 
 新闻源统计:
 本次分析基于以下新闻源：
-"""
-    for k in tracked:
-        stats_info += f"- {k}：{counters[k]}篇\n"
-    stats_info += f"- 其他来源：{other_count}篇\n\n"
-    stats_info += f"总计: {total_articles}篇新闻文章\n"
-    return stats_info
+"""]
+    parts.extend(f"- {k}：{counters[k]}篇\n" for k in tracked)
+    parts.append(f"- 其他来源：{other_count}篇\n\n")
+    parts.append(f"总计: {total_articles}篇新闻文章\n")
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=32)
+def _archive_dir(date_str: str, kind: str) -> Path:
+    """返回归档目录 docs/archive/YYYY-MM/YYYY-MM-DD/<kind>，每个目录在进程内只创建一次"""
+    path = PROJECT_ROOT / 'docs' / 'archive' / date_str[:7] / date_str / kind
+    path.mkdir(parents=True, exist_ok=True)
+    return path
 
 
 def save_markdown(date_str: str, markdown_text: str, model_suffix: str = 'deepseek') -> Path:
@@ -209,12 +298,10 @@ def save_markdown(date_str: str, markdown_text: str, model_suffix: str = 'deepse
     Returns:
         报告文件路径
     """
-    year_month = date_str[:7]
-    report_dir = PROJECT_ROOT / 'docs' / 'archive' / year_month / date_str / 'reports'
-    report_dir.mkdir(parents=True, exist_ok=True)
+    report_dir = _archive_dir(date_str, 'reports')
     
     # 获取北京时间
-    now = datetime.now(pytz.timezone('Asia/Shanghai'))
+    now = datetime.now(BEIJING_TZ)
     now_str = now.strftime('%Y-%m-%d %H:%M:%S')
     hour = now.hour
     
@@ -239,12 +326,18 @@ def save_markdown(date_str: str, markdown_text: str, model_suffix: str = 'deepse
     # 文件名包含场次，避免覆盖
     report_file = report_dir / f"📅 {date_str} 财经分析报告_{session}_{model_suffix}.md"
     
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    report_file.write_text(content, encoding='utf-8')
     print_success(f"报告已保存到: {report_file}")
     return report_file
 
 
+def dump_json_pretty(obj: Any) -> bytes:
+    """序列化为缩进两格的UTF-8 JSON字节（安装了 orjson 时使用 orjson，非ASCII字符原样输出）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
 def save_metadata(date_str: str, meta: Dict[str, Any], model_suffix: str = ''):
     """保存元数据
 
@@ -253,13 +346,11 @@ def save_metadata(date_str: str, meta: Dict[str, Any], model_suffix: str = ''):
         meta: 元数据字典
         model_suffix: 模型后缀（如 'deepseek'）
     """
-    year_month = date_str[:7]
     # 元数据单独存放在 metadata 目录
-    metadata_dir = PROJECT_ROOT / 'docs' / 'archive' / year_month / date_str / 'metadata'
-    metadata_dir.mkdir(parents=True, exist_ok=True)
+    metadata_dir = _archive_dir(date_str, 'metadata')
     
     # 获取北京时间，确定场次
-    now = datetime.now(pytz.timezone('Asia/Shanghai'))
+    now = datetime.now(BEIJING_TZ)
     hour = now.hour
     
     if 6 <= hour < 12:
@@ -281,8 +372,7 @@ def save_metadata(date_str: str, meta: Dict[str, Any], model_suffix: str = ''):
     meta['session'] = session
     meta['session_time'] = now.strftime('%Y-%m-%d %H:%M:%S')
     
-    with open(meta_file, 'w', encoding='utf-8') as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
+    meta_file.write_bytes(dump_json_pretty(meta))
     print_info(f'元数据已保存到: {meta_file}')
 
 
@@ -292,11 +382,25 @@ def write_json(path: Path, summary_md: str, articles: List[Dict[str, Any]]):
         'summary_markdown': summary_md,
         'articles': articles
     }
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    Path(path).write_bytes(dump_json_pretty(data))
     print_success(f'已导出 JSON: {path}')
 
 
+@lru_cache(maxsize=16)
+def _parse_csv_set(value: str) -> FrozenSet[str]:
+    """解析逗号分隔的过滤参数（去除空白和空项）"""
+    return frozenset(v.strip() for v in value.split(',') if v.strip())
+
+
+@lru_cache(maxsize=16)
+def _keyword_searcher(filter_keyword: str) -> Optional[Callable[[str], Any]]:
+    """将关键词编译成一个正则（小写匹配），每篇文章只需扫描一遍；无有效关键词时返回 None"""
+    kws = _parse_csv_set(filter_keyword)
+    if not kws:
+        return None
+    return re.compile('|'.join(re.escape(k.lower()) for k in kws)).search
+
+
 def filter_articles(articles: List[Dict[str, Any]], 
                     filter_source: Optional[str] = None,
                     filter_keyword: Optional[str] = None,
@@ -305,15 +409,23 @@ def filter_articles(articles: List[Dict[str, Any]],
     selected = articles
     
     if filter_source:
-        sources = {s.strip() for s in filter_source.split(',') if s.strip()}
+        sources = _parse_csv_set(filter_source)
         selected = [r for r in selected if (r.get('source') or '') in sources]
     
     if filter_keyword:
-        kws = {k.strip() for k in filter_keyword.split(',') if k.strip()}
-        def match_kw(r: Dict[str, Any]) -> bool:
-            text = f"{r.get('title','')} {r.get('summary','')}".lower()
-            return any(k.lower() in text for k in kws)
-        selected = [r for r in selected if match_kw(r)]
+        kw_search = _keyword_searcher(filter_keyword)
+        if kw_search is not None:
+            # 小写检索文本每篇只生成一次；限制了条数时凑够即停，后续文章不再转换
+            matched = (
+                r for r in selected
+                if kw_search(f"{r.get('title','')} {r.get('summary','')}".lower())
+            )
+            if max_articles and max_articles > 0:
+                selected = list(islice(matched, max_articles))
+            else:
+                selected = list(matched)
+        else:
+            selected = []
     
     if max_articles and max_articles > 0:
         selected = selected[:max_articles]
@@ -323,7 +435,7 @@ def filter_articles(articles: List[Dict[str, Any]],
 
 def resolve_date_range(args) -> Tuple[str, str]:
     """解析日期范围"""
-    today = datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d')
+    today = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d')
     if hasattr(args, 'date') and args.date:
         day = validate_date(args.date)
         return day, day
@@ -18,26 +18,43 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 from functools import lru_cache
 
+# 优先使用 libyaml 的 C 解析器，未编译 libyaml 时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# 直接运行本文件时没有包上下文，从同目录导入
+try:
+    from ._paths import PROJECT_ROOT
+except ImportError:
+    from _paths import PROJECT_ROOT
+
+
+@lru_cache(maxsize=256)
+def _env_key(key_path: str) -> str:
+    """配置路径对应的环境变量名（如 'api_keys.deepseek' -> 'API_KEYS_DEEPSEEK'）"""
+    return key_path.upper().replace('.', '_')
+
 
 class ConfigManager:
     """配置管理器（单例模式）"""
     
     _instance: Optional['ConfigManager'] = None
     _config: Optional[Dict[str, Any]] = None
+    _flat: Optional[Dict[str, Any]] = None
+    _config_mtime: Optional[int] = None
+    
+    # 路径在类定义时确定，实例无需再初始化
+    project_root: Path = PROJECT_ROOT
+    config_path: Path = PROJECT_ROOT / 'config' / 'config.yml'
+    example_config_path: Path = PROJECT_ROOT / 'config' / 'config.example.yml'
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        # 只初始化一次
-        if not hasattr(self, '_initialized'):
-            self.project_root = Path(__file__).resolve().parents[2]
-            self.config_path = self.project_root / 'config' / 'config.yml'
-            self.example_config_path = self.project_root / 'config' / 'config.example.yml'
-            self._initialized = True
-    
     @property
     def config(self) -> Dict[str, Any]:
         """
@@ -71,18 +88,49 @@ class ConfigManager:
                     raise FileNotFoundError(f'配置文件不存在: {self.config_path}')
         
         try:
+            # 先记录修改时间再读取，读取期间文件若被改动，下次 reload 仍会重新解析
+            self._config_mtime = self.config_path.stat().st_mtime_ns
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+                self._config = yaml.load(f, Loader=YamlLoader) or {}
         except yaml.YAMLError as e:
             raise ValueError(f'配置文件格式错误: {e}')
         except Exception as e:
             raise RuntimeError(f'读取配置文件失败: {e}')
     
     def reload(self):
-        """重新加载配置"""
+        """重新加载配置（配置文件修改时间未变时跳过解析）"""
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._config is not None and mtime is not None and mtime == self._config_mtime:
+            return
         self._config = None
+        self._flat = None
         self._load_config()
     
+    @staticmethod
+    def _flatten(config: Any) -> Dict[str, Any]:
+        """
+        将嵌套配置展开为 {点号路径: 值}，中间层级的字典同样保留
+        
+        非字符串键和本身含点号的键无法通过点号路径访问，展开时跳过。
+        """
+        flat: Dict[str, Any] = {}
+        if not isinstance(config, dict):
+            return flat
+        stack = [('', config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                if not isinstance(key, str) or '.' in key:
+                    continue
+                path = prefix + key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + '.', value))
+        return flat
+    
     def get(self, key_path: str, default: Any = None, use_env: bool = True) -> Any:
         """
         获取配置值，支持点号路径访问
@@ -102,22 +150,14 @@ class ConfigManager:
         """
         # 先尝试从环境变量获取（如果允许）
         if use_env:
-            env_key = key_path.upper().replace('.', '_')
-            env_value = os.getenv(env_key)
+            env_value = os.environ.get(_env_key(key_path))
             if env_value is not None:
                 return env_value
         
-        # 从配置文件获取
-        keys = key_path.split('.')
-        value = self.config
-        
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-                if value is None:
-                    return default
-            else:
-                return default
+        # 从配置文件获取（首次访问时展开为点号路径索引，之后单次字典查找）
+        if self._flat is None:
+            self._flat = self._flatten(self.config)
+        value = self._flat.get(key_path)
         
         return value if value is not None else default
     
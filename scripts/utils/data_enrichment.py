@@ -13,10 +13,163 @@
 
 import re
 import json
+import hashlib
+import threading
+import time
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+SINA_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'http://finance.sina.com.cn'
+}
+
+# 新浪行情多代码响应中的每一行：var hq_str_sh600519="...";
+SINA_QUOTE_RE = re.compile(r'hq_str_(\w+)="([^"]*)"')
+
+# 新浪行情字段：名称、昨收、现价、最高、最低、成交量（股）
+_SINA_FIELDS = itemgetter(0, 2, 3, 4, 5, 8)
+
+# 并发获取非A股行情的最大线程数
+REALTIME_MAX_WORKERS = 16
+
+# 行情缓存：60秒后过期，避免长时间运行的进程一直返回旧价格
+QUOTE_CACHE_SIZE = 2048
+QUOTE_CACHE_TTL = 60
+# 公司名 -> 股票代码缓存：代码几乎不变，保留一天
+CODE_CACHE_SIZE = 4096
+CODE_CACHE_TTL = 86400
+# 报告摘要 -> AI提取结果：同一份报告反复增强时跳过AI调用
+EXTRACT_CACHE_SIZE = 256
+EXTRACT_CACHE_TTL = 3600
+
+_MISSING = object()
+
+# 数据附录表格（表头与行模板，行模板按股票数据字典填充）
+_US_TABLE_HEADER = "| 代码 | 名称 | 当前价 | 涨跌 | 市值(亿$) | PE |\n|------|------|--------|------|-----------|----|\n"
+_US_ROW = "| {code} | {name} | ${price} | {change} | {market_cap_billion} | {pe} |\n"
+_CN_TABLE_HEADER = "| 代码 | 名称 | 当前价 | 涨跌 | 最高 | 最低 |\n|------|------|--------|------|------|------|\n"
+_CN_ROW = "| {code} | {name} | ¥{price} | {change} | ¥{high} | ¥{low} |\n"
+
+# 送入AI提取的报告长度上限，以及超出时每个标题下保留的正文长度
+EXTRACT_BUDGET_CHARS = 8000
+EXTRACT_SECTION_CHARS = 400
+
+_MD_HEADER_RE = re.compile(r'^#{1,6}\s.*$', re.M)
+
+# 扫描JSON对象边界时只关心这几个字符
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+
+def _extract_first_json(text: str) -> Optional[str]:
+    """
+    截取文本中第一个完整的JSON对象
+    
+    按括号深度匹配，支持嵌套对象和字符串内的括号，可跳过AI回复中的代码块标记等前后缀
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    skip_to = -1  # 反斜杠转义的下一个字符
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        i = match.start()
+        if i < skip_to:
+            continue
+        ch = text[i]
+        if in_string:
+            if ch == '\\':
+                skip_to = i + 2
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _prepare_extract_input(text: str,
+                           budget_chars: int = EXTRACT_BUDGET_CHARS,
+                           section_chars: int = EXTRACT_SECTION_CHARS) -> str:
+    """
+    压缩送入AI提取的报告正文
+    
+    未超出预算时原样返回；否则保留所有 Markdown 标题，每个标题下只保留开头
+    section_chars 个字符的正文，整体不超过 budget_chars。
+    """
+    if len(text) <= budget_chars:
+        return text
+    
+    headers = list(_MD_HEADER_RE.finditer(text))
+    first_header = headers[0].start() if headers else len(text)
+    blocks = [text[:min(first_header, section_chars)]]
+    for i, match in enumerate(headers):
+        section_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = text[match.end():min(section_end, match.end() + section_chars)]
+        blocks.append(match.group() + body)
+    
+    return '\n'.join(block.strip('\n') for block in blocks if block.strip())[:budget_chars]
+
+
+def parse_ai_json(text: str) -> Optional[Dict]:
+    """解析AI回复中的第一个JSON对象（安装了 orjson 时使用 orjson），找不到时返回 None"""
+    fragment = _extract_first_json(text)
+    if fragment is None:
+        return None
+    return orjson.loads(fragment) if orjson is not None else json.loads(fragment)
+
+
+class TTLCache:
+    """带过期时间和容量上限的缓存（超出容量时淘汰最久未访问的条目，线程安全）"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
 
 class DataEnricher:
     """智能数据增强器"""
@@ -27,7 +180,29 @@ class DataEnricher:
             ai_client: AI客户端（如DeepSeek），用于提取投资建议
         """
         self.ai_client = ai_client
-        self.cache = {}
+        self.session = self._create_session()
+        self.cache = TTLCache(QUOTE_CACHE_SIZE, QUOTE_CACHE_TTL)
+        # 公司名 -> 股票代码信息（None 表示已确认查不到）
+        self.code_cache = TTLCache(CODE_CACHE_SIZE, CODE_CACHE_TTL)
+        # 报告内容摘要 -> 提取出的投资建议
+        self.extract_cache = TTLCache(EXTRACT_CACHE_SIZE, EXTRACT_CACHE_TTL)
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """创建复用连接的行情请求会话（瞬时错误自动重试，新浪请求头预先设置）"""
+        retry = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503],
+            allowed_methods=frozenset(['GET'])
+        )
+        session = requests.Session()
+        # 连接池容量覆盖行情并发线程数
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(SINA_HEADERS)
+        return session
     
     # ==================== AI提取投资建议 ====================
     
@@ -48,11 +223,16 @@ class DataEnricher:
             print("⚠️ 未提供AI客户端，跳过智能提取")
             return []
         
+        cache_key = hashlib.blake2b(report_text.encode('utf-8'), digest_size=16).hexdigest()
+        cached = self.extract_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         extraction_prompt = f"""
 请仔细分析以下财经报告，提取出所有投资建议和提到的上市公司。
 
 报告内容：
-{report_text}
+{_prepare_extract_input(report_text)}
 
 请以JSON格式输出，只输出JSON，不要任何其他文字：
 {{
@@ -79,7 +259,11 @@ class DataEnricher:
         try:
             # 调用AI进行提取
             result = self._call_ai_extract(extraction_prompt)
-            suggestions = json.loads(result).get('suggestions', [])
+            data = parse_ai_json(result)
+            if data is None:
+                raise ValueError('AI返回中未找到JSON')
+            suggestions = data.get('suggestions', [])
+            self.extract_cache[cache_key] = suggestions
             return suggestions
         except Exception as e:
             print(f"⚠️ AI提取失败: {e}")
@@ -124,7 +308,7 @@ class DataEnricher:
 请从以下财经报告中找出所有提到的上市公司名称。
 
 报告内容：
-{report_text[:2000]}  # 只取前2000字符，避免太长
+{_prepare_extract_input(report_text, budget_chars=2000)}
 
 要求：
 1. 只输出公司名称，一行一个
@@ -141,8 +325,8 @@ NVIDIA
         try:
             result = self._call_ai_extract(prompt)
             # 解析结果（每行一个公司）
-            companies = [line.strip() for line in result.strip().split('\n') if line.strip()]
-            return [{'name': c} for c in companies[:10]]  # 最多10个
+            companies = filter(None, (line.strip() for line in result.split('\n')))
+            return [{'name': c} for c in islice(companies, 10)]  # 最多10个
         except Exception as e:
             print(f"⚠️ 提取失败: {e}")
             return []
@@ -159,6 +343,10 @@ NVIDIA
         Returns:
             {'code': '股票代码', 'name': '公司全称', 'market': 'CN/US/HK'}
         """
+        cached = self.code_cache.get(company_name, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
         if not self.ai_client:
             return None
         
@@ -180,77 +368,88 @@ NVIDIA
         try:
             result = self._call_ai_extract(prompt)
             # 提取JSON
-            json_match = re.search(r'\{[^}]+\}', result)
-            if json_match:
-                data = json.loads(json_match.group())
+            data = parse_ai_json(result)
+            if data:
                 if data.get('code'):
+                    self.code_cache[company_name] = data
                     return data
         except Exception as e:
             print(f"⚠️ AI查询{company_name}失败: {e}")
         
         return None
     
+    def search_stock_codes_batch(self, company_names: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        一次AI调用批量查询多个公司的股票代码
+        
+        结果写入 code_cache；批量结果中缺失的公司不写缓存，
+        之后由 search_stock_code_with_ai 单独查询。
+        
+        Args:
+            company_names: 公司名称列表
+            
+        Returns:
+            {公司名称: {'code': '股票代码', 'name': '公司全称', 'market': 'CN/US/HK'} 或 None}
+        """
+        pending = [name for name in dict.fromkeys(company_names) if name not in self.code_cache]
+        if not pending or not self.ai_client:
+            return {name: self.code_cache.get(name) for name in company_names}
+        
+        prompt = f"""
+请告诉我以下每个公司的股票代码。
+
+公司列表（JSON数组）：
+{json.dumps(pending, ensure_ascii=False)}
+
+要求：
+1. 如果是A股，格式为：sh600519 或 sz002594（加上交易所前缀）
+2. 如果是美股，格式为：AAPL, NVDA等（纯代码）
+3. 如果是港股，格式为：hk00700
+4. query 字段原样填写列表中的公司名称，每个公司输出一项
+5. 如果不知道或不是上市公司，code 填 null
+
+只输出JSON格式：
+{{"results": [{{"query": "列表中的公司名称", "code": "股票代码", "name": "公司全称", "market": "CN/US/HK"}}]}}
+"""
+        
+        try:
+            result = self._call_ai_extract(prompt)
+            data = parse_ai_json(result)
+            if data:
+                for item in data.get('results', []):
+                    query = item.get('query')
+                    if query in pending:
+                        self.code_cache[query] = item if item.get('code') else None
+        except Exception as e:
+            print(f"⚠️ AI批量查询股票代码失败: {e}")
+        
+        return {name: self.code_cache.get(name) for name in company_names}
+    
     # ==================== 股票数据获取 ====================
     
     def get_stock_realtime_data(self, stock_code: str, market: str = "CN") -> Optional[Dict]:
         """获取股票实时数据"""
         cache_key = f"{market}_{stock_code}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             if market == "CN":
                 # A股数据（新浪财经）
                 url = f"http://hq.sinajs.cn/list={stock_code}"
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Referer': 'http://finance.sina.com.cn'
-                }
-                response = requests.get(url, headers=headers, timeout=5)
+                response = self.session.get(url, timeout=5)
                 response.encoding = 'gbk'
                 
                 # 解析返回数据
-                if '"' not in response.text:
-                    # print(f"⚠️ {stock_code}: API返回格式异常")
-                    return None
-                
                 parts = response.text.split('"')
                 if len(parts) < 2:
-                    return None
-                    
-                data_str = parts[1]
-                if not data_str or data_str.strip() == '':
-                    # print(f"⚠️ {stock_code}: 无数据（可能股票代码不存在或已退市）")
-                    return None
-                
-                data_list = data_str.split(',')
-                if len(data_list) < 32:
-                    # print(f"⚠️ {stock_code}: 数据字段不完整 (仅{len(data_list)}个字段)")
+                    # API返回格式异常
                     return None
                 
-                # 验证价格数据有效性
-                try:
-                    current_price = float(data_list[3])
-                    close_yesterday = float(data_list[2])
-                    if current_price <= 0:
-                        # print(f"⚠️ {stock_code}: 价格数据无效")
-                        return None
-                except (ValueError, IndexError):
-                    return None
-                
-                change_pct = round((current_price - close_yesterday) / close_yesterday * 100, 2) if close_yesterday > 0 else 0
-                
-                result = {
-                    'code': stock_code,
-                    'name': data_list[0],
-                    'price': current_price,
-                    'change': f"{'+' if change_pct > 0 else ''}{change_pct}%",
-                    'high': float(data_list[4]),
-                    'low': float(data_list[5]),
-                    'volume_million': round(int(data_list[8]) / 1e6, 2),
-                }
-                
-                self.cache[cache_key] = result
+                result = self._parse_sina_quote(stock_code, parts[1])
+                if result:
+                    self.cache[cache_key] = result
                 return result
                 
             elif market == "US":
@@ -280,6 +479,101 @@ NVIDIA
             # print(f"⚠️ 获取{stock_code}数据失败: {e}")
             return None
     
+    @staticmethod
+    def _parse_sina_quote(stock_code: str, data_str: str) -> Optional[Dict]:
+        """解析新浪行情引号内的逗号分隔字段"""
+        if not data_str or data_str.strip() == '':
+            # 无数据（可能股票代码不存在或已退市）
+            return None
+        
+        if data_str.count(',') < 31:
+            # 数据字段不完整（完整行情至少32个字段）
+            return None
+        
+        # 只切分用到的前9个字段，其余部分留在最后一段不再拆开
+        name, close_yesterday, current_price, high, low, volume = _SINA_FIELDS(data_str.split(',', 9))
+        
+        # 验证价格数据有效性
+        try:
+            current_price = float(current_price)
+            close_yesterday = float(close_yesterday)
+            if current_price <= 0:
+                return None
+            
+            change_pct = round((current_price - close_yesterday) / close_yesterday * 100, 2) if close_yesterday > 0 else 0
+            
+            return {
+                'code': stock_code,
+                'name': name,
+                'price': current_price,
+                'change': f"{'+' if change_pct > 0 else ''}{change_pct}%",
+                'high': float(high),
+                'low': float(low),
+                'volume_million': round(int(volume) / 1e6, 2),
+            }
+        except ValueError:
+            return None
+    
+    def _fetch_sina_batch(self, stock_codes: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        一次新浪请求获取多只A股的行情
+        
+        Returns:
+            {股票代码: 行情数据或None}，只包含响应中出现的代码；请求失败时返回空字典
+        """
+        by_lower = {code.lower(): code for code in stock_codes}
+        try:
+            url = f"http://hq.sinajs.cn/list={','.join(stock_codes)}"
+            response = self.session.get(url, timeout=5)
+            response.encoding = 'gbk'
+        except Exception:
+            return {}
+        
+        results = {}
+        for code, data_str in SINA_QUOTE_RE.findall(response.text):
+            stock_code = by_lower.get(code.lower())
+            if stock_code is None:
+                continue
+            data = self._parse_sina_quote(stock_code, data_str)
+            if data:
+                self.cache[f"CN_{stock_code}"] = data
+            results[stock_code] = data
+        return results
+    
+    def get_stock_realtime_data_batch(self, stocks: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict]]:
+        """
+        批量获取股票实时数据
+        
+        A股合并为一次新浪请求；其余市场以及批量响应中缺失的代码用线程池并发单独获取。
+        
+        Args:
+            stocks: [(股票代码, 市场), ...]
+            
+        Returns:
+            {(股票代码, 市场): 行情数据或None}
+        """
+        results: Dict[Tuple[str, str], Optional[Dict]] = {}
+        pending = []
+        for key in dict.fromkeys(stocks):
+            cached = self.cache.get(f"{key[1]}_{key[0]}")
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append(key)
+        
+        cn_codes = [code for code, market in pending if market == "CN"]
+        if len(cn_codes) > 1:
+            for code, data in self._fetch_sina_batch(cn_codes).items():
+                results[(code, "CN")] = data
+        
+        rest = [key for key in pending if key not in results]
+        if rest:
+            with ThreadPoolExecutor(max_workers=min(REALTIME_MAX_WORKERS, len(rest))) as executor:
+                for key, data in zip(rest, executor.map(lambda k: self.get_stock_realtime_data(*k), rest)):
+                    results[key] = data
+        
+        return results
+    
     # ==================== 报告增强 ====================
     
     def enrich_report(self, report_text: str) -> str:
@@ -307,38 +601,53 @@ NVIDIA
             print("ℹ️ 未提取到具体公司，跳过数据增强")
             return report_text
         
-        # 查询股票数据
-        enriched_data = []
+        # 一次AI调用查询所有公司的股票代码（未返回的公司在循环中单独查询）
+        self.search_stock_codes_batch([
+            company.get('name')
+            for suggestion in suggestions
+            for company in islice(suggestion.get('companies', []), 5)
+            if company.get('name')
+        ])
+        
+        # 先确定每个主题下公司的股票代码
+        resolved = []
         total_companies = 0
-        success_count = 0
         
         for suggestion in suggestions:
             theme = suggestion.get('theme', '投资建议')
             companies = suggestion.get('companies', [])
             
-            theme_data = {'theme': theme, 'stocks': []}
-            
-            for company in companies[:5]:  # 每个主题最多5个公司
+            entries = []
+            for company in islice(companies, 5):  # 每个主题最多5个公司
                 company_name = company.get('name')
                 if not company_name:
                     continue
                 
                 total_companies += 1
                 
-                # 使用AI查询股票代码
+                # 股票代码（优先取批量查询结果）
                 stock_info = self.search_stock_code_with_ai(company_name)
-                if not stock_info:
-                    continue
-                
-                # 获取实时数据
-                realtime_data = self.get_stock_realtime_data(
-                    stock_info['code'],
-                    stock_info['market']
-                )
-                
+                if stock_info:
+                    entries.append((company, stock_info['code'], stock_info['market']))
+            
+            resolved.append((theme, entries))
+        
+        # 批量获取所有股票的实时数据
+        quotes = self.get_stock_realtime_data_batch([
+            (code, market) for _, entries in resolved for _, code, market in entries
+        ])
+        
+        enriched_data = []
+        success_count = 0
+        
+        for theme, entries in resolved:
+            theme_data = {'theme': theme, 'stocks': []}
+            
+            for company, code, market in entries:
+                realtime_data = quotes.get((code, market))
                 if realtime_data:
-                    realtime_data['reason'] = company.get('reason', '')
-                    theme_data['stocks'].append(realtime_data)
+                    # 复制缓存中的数据，同一股票出现在多个主题时各自保留推荐理由
+                    theme_data['stocks'].append(dict(realtime_data, reason=company.get('reason', '')))
                     success_count += 1
             
             if theme_data['stocks']:
@@ -356,34 +665,33 @@ NVIDIA
             print("⚠️ 未获取到有效股票数据，跳过数据增强")
             return report_text
         
-        # 生成数据附录
-        enriched_report = report_text
-        enriched_report += "\n\n---\n\n"
-        enriched_report += "## 📊 实时数据参考\n\n"
-        enriched_report += "> 以下为报告中提到的相关公司的实时股票数据，供参考。\n\n"
+        # 生成数据附录（各段落收集到列表中，最后一次拼接）
+        parts = [
+            report_text,
+            "\n\n---\n\n",
+            "## 📊 实时数据参考\n\n",
+            "> 以下为报告中提到的相关公司的实时股票数据，供参考。\n\n",
+        ]
         
         for theme_data in enriched_data:
-            enriched_report += f"\n### {theme_data['theme']}\n\n"
+            parts.append(f"\n### {theme_data['theme']}\n\n")
             
             # 生成表格
             stocks = theme_data['stocks']
             if stocks[0].get('market_cap_billion'):
                 # 美股表格
-                enriched_report += "| 代码 | 名称 | 当前价 | 涨跌 | 市值(亿$) | PE |\n"
-                enriched_report += "|------|------|--------|------|-----------|----|\n"
-                for stock in stocks:
-                    enriched_report += f"| {stock['code']} | {stock['name']} | ${stock['price']} | {stock['change']} | {stock['market_cap_billion']} | {stock['pe']} |\n"
+                header, row = _US_TABLE_HEADER, _US_ROW
             else:
                 # A股表格
-                enriched_report += "| 代码 | 名称 | 当前价 | 涨跌 | 最高 | 最低 |\n"
-                enriched_report += "|------|------|--------|------|------|------|\n"
-                for stock in stocks:
-                    enriched_report += f"| {stock['code']} | {stock['name']} | ¥{stock['price']} | {stock['change']} | ¥{stock['high']} | ¥{stock['low']} |\n"
+                header, row = _CN_TABLE_HEADER, _CN_ROW
+            parts.append(header)
+            parts.extend(map(row.format_map, stocks))
             
-            enriched_report += "\n"
+            parts.append("\n")
         
-        enriched_report += f"\n> 💡 数据更新时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        enriched_report += "\n**免责声明**：以上数据仅供参考，不构成投资建议。\n"
+        parts.append(f"\n> 💡 数据更新时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        parts.append("\n**免责声明**：以上数据仅供参考，不构成投资建议。\n")
+        enriched_report = ''.join(parts)
         
         print(f"✅ 数据增强完成，添加了{len(enriched_data)}个主题的实时数据")
         return enriched_report
@@ -12,9 +12,10 @@
 
 import sqlite3
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 import argparse
 
 # 添加项目路径
@@ -29,6 +30,27 @@ from scripts.utils.print_utils import (
 
 logger = get_logger('db_maintenance')
 
+# 维护会话的 PRAGMA：VACUUM/ANALYZE 需要遍历所有页，加大页缓存并启用内存映射以减少读盘；
+# 数据库在初始化时已切换为 WAL，维护期间 synchronous=NORMAL 只在检查点时 fsync
+MAINTENANCE_PRAGMAS = (
+    'PRAGMA cache_size=-262144',   # 256MB
+    'PRAGMA mmap_size=268435456',  # 256MB
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA synchronous=NORMAL',
+)
+
+# 健康检查用的计数查询：索引数、统计信息行数、文章总数
+HEALTH_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM sqlite_master
+         WHERE type='index' AND tbl_name='news_articles'),
+        (SELECT COUNT(*) FROM sqlite_stat1),
+        (SELECT COUNT(*) FROM news_articles)
+"""
+
+# 清理旧数据时每批删除的行数
+CLEANUP_BATCH_SIZE = 5000
+
 
 class DatabaseMaintenance:
     """数据库维护工具"""
@@ -44,6 +66,18 @@ class DatabaseMaintenance:
         if not self.db_path.exists():
             raise FileNotFoundError(f"数据库文件不存在: {db_path}")
 
+    @contextmanager
+    def _tuned_connect(self) -> Iterator[sqlite3.Connection]:
+        """打开应用了维护 PRAGMA 的连接（正常退出时提交、异常时回滚，最后关闭连接）"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for pragma in MAINTENANCE_PRAGMAS:
+                conn.execute(pragma)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
     def optimize_indexes(self, rebuild: bool = False):
         """
         优化索引
@@ -53,7 +87,7 @@ class DatabaseMaintenance:
         """
         print_header("📊 索引优化")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._tuned_connect() as conn:
             cursor = conn.cursor()
 
             if rebuild:
@@ -64,6 +98,8 @@ class DatabaseMaintenance:
                     'idx_articles_date_created',
                     'idx_articles_date_published',
                     'idx_articles_source_date',
+                    # 已被 idx_articles_date_sort 取代
+                    'idx_articles_collection_date',
                 ]
 
                 for idx_name in redundant_indexes:
@@ -81,6 +117,13 @@ class DatabaseMaintenance:
                     ON news_articles(collection_date, source_id, published DESC)
                     """,
 
+                    # 日期 + 排序列的覆盖索引（与采集脚本初始化时的定义一致）
+                    # AI 分析取最新 N 篇时按它只读索引选出 id（rowid 隐含在索引中）
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_articles_date_sort
+                    ON news_articles(collection_date, published, created_at)
+                    """,
+
                     # 来源 + 日期（反向查询）
                     """
                     CREATE INDEX IF NOT EXISTS idx_source_date
@@ -130,7 +173,7 @@ class DatabaseMaintenance:
 
         print_info("正在执行 VACUUM（可能需要几分钟）...")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._tuned_connect() as conn:
             conn.execute("VACUUM")
 
         # 获取优化后大小
@@ -146,10 +189,14 @@ class DatabaseMaintenance:
 
         logger.info(f"VACUUM完成，节省 {saved:.2f} MB")
 
-    def health_check(self) -> Dict[str, Any]:
+    def health_check(self, deep: bool = False) -> Dict[str, Any]:
         """
         健康检查
 
+        Args:
+            deep: 是否执行完整的 integrity_check（默认使用更快的 quick_check，
+                  跳过索引顺序校验）
+
         Returns:
             健康状态报告
         """
@@ -162,12 +209,12 @@ class DatabaseMaintenance:
             'errors': []
         }
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._tuned_connect() as conn:
             cursor = conn.cursor()
 
             # 1. 完整性检查
             print_info("检查数据完整性...")
-            cursor.execute("PRAGMA integrity_check")
+            cursor.execute("PRAGMA integrity_check" if deep else "PRAGMA quick_check")
             integrity_result = cursor.fetchone()[0]
 
             if integrity_result == 'ok':
@@ -190,13 +237,13 @@ class DatabaseMaintenance:
             else:
                 print_success(f"✓ 碎片页数: {fragmentation}（正常）")
 
+            # 索引数、统计信息数、文章总数合并为一次查询
+            index_count, stats_count, article_count = cursor.execute(
+                HEALTH_COUNTS_SQL
+            ).fetchone()
+
             # 3. 索引检查
             print_info("检查索引...")
-            cursor.execute("""
-                SELECT COUNT(*) FROM sqlite_master
-                WHERE type='index' AND tbl_name='news_articles'
-            """)
-            index_count = cursor.fetchone()[0]
             health['checks']['index_count'] = index_count
 
             # 合理范围：4-6个索引
@@ -211,8 +258,6 @@ class DatabaseMaintenance:
 
             # 4. 统计信息检查
             print_info("检查统计信息...")
-            cursor.execute("SELECT COUNT(*) FROM sqlite_stat1")
-            stats_count = cursor.fetchone()[0]
             health['checks']['statistics_tables'] = stats_count
 
             if stats_count == 0:
@@ -223,8 +268,6 @@ class DatabaseMaintenance:
 
             # 5. 数据量检查
             print_info("检查数据量...")
-            cursor.execute("SELECT COUNT(*) FROM news_articles")
-            article_count = cursor.fetchone()[0]
             health['checks']['article_count'] = article_count
             print_info(f"文章总数: {article_count}")
 
@@ -258,7 +301,7 @@ class DatabaseMaintenance:
         cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
         print_info(f"截止日期: {cutoff_date}")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._tuned_connect() as conn:
             cursor = conn.cursor()
 
             # 查询将被删除的数据量
@@ -278,14 +321,21 @@ class DatabaseMaintenance:
                 print_info("🔍 模拟运行模式（不会实际删除）")
                 print_info("如需执行删除，请使用 --no-dry-run 参数")
             else:
-                # 实际删除
-                cursor.execute("""
-                    DELETE FROM news_articles
-                    WHERE collection_date < ?
-                """, (cutoff_date,))
-
-                deleted = cursor.rowcount
-                conn.commit()
+                # 分批删除并逐批提交，避免长时间锁库和 WAL 膨胀
+                deleted = 0
+                while True:
+                    cursor.execute("""
+                        DELETE FROM news_articles
+                        WHERE rowid IN (
+                            SELECT rowid FROM news_articles
+                            WHERE collection_date < ?
+                            LIMIT ?
+                        )
+                    """, (cutoff_date, CLEANUP_BATCH_SIZE))
+                    conn.commit()
+                    if cursor.rowcount <= 0:
+                        break
+                    deleted += cursor.rowcount
 
                 print_success(f"✓ 已删除 {deleted} 条数据")
                 logger.info(f"清理了 {deleted} 条旧数据（{cutoff_date}之前）")
@@ -306,7 +356,7 @@ class DatabaseMaintenance:
 
         # 3. 最终优化
         print_header("🎯 最终优化")
-        with sqlite3.connect(self.db_path) as conn:
+        with self._tuned_connect() as conn:
             conn.execute("PRAGMA optimize")
         print_success("✓ 数据库维护完成")
 
@@ -340,6 +390,11 @@ def main():
         action='store_true',
         help='健康检查'
     )
+    parser.add_argument(
+        '--deep',
+        action='store_true',
+        help='健康检查时执行完整的 integrity_check（较慢）'
+    )
     parser.add_argument(
         '--cleanup',
         type=int,
@@ -367,7 +422,7 @@ def main():
         elif args.vacuum:
             maintenance.vacuum()
         elif args.health_check:
-            maintenance.health_check()
+            maintenance.health_check(deep=args.deep)
         elif args.cleanup:
             maintenance.cleanup_old_data(
                 days_to_keep=args.cleanup,
@@ -375,7 +430,7 @@ def main():
             )
         else:
             # 默认：健康检查
-            maintenance.health_check()
+            maintenance.health_check(deep=args.deep)
 
     except Exception as e:
         print_error(f"执行失败: {e}")
@@ -11,45 +11,181 @@
 - 错误处理和重试
 """
 
+import queue
+import re
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, List, Tuple, Any, Optional, Dict
-from functools import wraps
+from typing import Generator, Iterable, List, Tuple, Any, Optional, Dict
+from functools import lru_cache, wraps
+from itertools import chain, islice
 
 from .logger import get_logger
 
 logger = get_logger('db_manager')
 
+# 每个连接建立时执行的 PRAGMA（WAL 下 synchronous=NORMAL 只在检查点时 fsync）
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',  # 256MB
+    'PRAGMA cache_size=-65536',    # 64MB
+)
+
+# transaction() 支持的事务类型与对应的 BEGIN 语句
+TRANSACTION_BEGIN = {
+    'deferred': 'BEGIN DEFERRED',
+    'immediate': 'BEGIN IMMEDIATE',
+    'exclusive': 'BEGIN EXCLUSIVE',
+}
+
+# 可改写为多行 VALUES 的单行 INSERT：列名列表 + 一组不含括号和引号的值模板
+_SINGLE_ROW_INSERT_RE = re.compile(
+    r'^\s*(INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\w+\s*\([^)]+\)\s*VALUES)\s*(\([^()\'"]*\))\s*;?\s*$',
+    re.I
+)
+
+# 多行 INSERT 每条语句最多包含的行数，以及单条语句的参数上限（兼容旧版 SQLite 的 999）
+MULTI_VALUES_ROWS = 500
+MAX_SQL_PARAMS = 999
+
+# 连接池默认容量（连接按需创建，最多保留这么多个）
+DEFAULT_POOL_SIZE = 4
+
 
 class DatabaseError(Exception):
     """数据库操作异常"""
     pass
 
 
+@lru_cache(maxsize=64)
+def _multi_values_plan(sql: str) -> Optional[Tuple[str, str, int]]:
+    """
+    解析单行 INSERT 语句，返回 (语句头, 单行值模板, 每行参数个数)
+    
+    不是可改写的 INSERT（或不含参数）时返回 None
+    """
+    match = _SINGLE_ROW_INSERT_RE.match(sql)
+    if not match:
+        return None
+    row_sql = match.group(2)
+    width = row_sql.count('?')
+    if width == 0:
+        return None
+    return match.group(1) + ' ', row_sql, width
+
+
 class DatabaseManager:
     """数据库管理器"""
     
-    def __init__(self, db_path: Path, timeout: int = 30):
+    def __init__(self, db_path: Path, timeout: int = 30, pool_size: int = DEFAULT_POOL_SIZE):
         """
         初始化数据库管理器
         
         Args:
             db_path: 数据库文件路径
             timeout: 数据库锁超时时间（秒）
+            pool_size: 连接池容量
         """
         self.db_path = Path(db_path)
         self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        
+        # 持久连接池：后进先出，优先复用刚归还、页缓存最热的连接
+        self._pool: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._created = 0
         
         # 确保数据库目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._enable_wal()
+    
+    def _enable_wal(self):
+        """切换到 WAL 日志模式（持久化在数据库文件中，只需设置一次）"""
+        try:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"启用WAL模式失败: {e}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        建立连接并应用连接级 PRAGMA
+        
+        连接会在线程间借还，因此关闭同线程检查；isolation_level=None 关闭
+        sqlite3 模块的隐式事务，事务边界统一由 transaction() 显式控制
+        """
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _acquire(self, row_factory: bool = True) -> sqlite3.Connection:
+        """从连接池借出连接；池空且未达容量时新建，否则等待其他调用方归还"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._created < self.pool_size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._pool_lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._pool.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError('等待数据库连接超时') from None
+        conn.row_factory = sqlite3.Row if row_factory else None
+        return conn
+    
+    def _release(self, conn: sqlite3.Connection):
+        """归还连接；未提交的改动先回滚，与关闭连接时的行为一致"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"回滚未完成事务失败，丢弃连接: {e}")
+            conn.close()
+            with self._pool_lock:
+                self._created -= 1
+            return
+        self._pool.put(conn)
+    
+    def close(self):
+        """关闭连接池中的所有空闲连接（之后的调用会按需重新建立连接）"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._pool_lock:
+                self._created -= 1
     
     @contextmanager
     def get_connection(self, row_factory: bool = True) -> Generator[sqlite3.Connection, None, None]:
         """
         获取数据库连接（上下文管理器）
         
+        连接处于自动提交模式，每条语句单独生效；需要原子写入时请使用 transaction()
+        
         Args:
             row_factory: 是否使用Row工厂（返回字典式访问）
         
@@ -64,9 +200,7 @@ class DatabaseManager:
         """
         conn = None
         try:
-            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
-            if row_factory:
-                conn.row_factory = sqlite3.Row
+            conn = self._acquire(row_factory)
             
             yield conn
             
@@ -75,15 +209,20 @@ class DatabaseManager:
             raise DatabaseError(f"数据库连接失败: {e}") from e
         finally:
             if conn:
-                conn.close()
+                self._release(conn)
     
     @contextmanager
-    def transaction(self, row_factory: bool = True) -> Generator[sqlite3.Connection, None, None]:
+    def transaction(self, row_factory: bool = True,
+                    transaction_type: str = 'immediate') -> Generator[sqlite3.Connection, None, None]:
         """
         事务管理器（自动提交或回滚）
         
+        默认以 BEGIN IMMEDIATE 开始事务，进入时即取得写锁，
+        避免读事务中途升级为写事务时出现 "database is locked"
+        
         Args:
             row_factory: 是否使用Row工厂
+            transaction_type: 事务类型（deferred / immediate / exclusive）
         
         Yields:
             sqlite3.Connection: 数据库连接
@@ -95,11 +234,14 @@ class DatabaseManager:
             ...     cursor.execute("INSERT INTO ...")
             ...     # 事务会自动提交
         """
+        begin = TRANSACTION_BEGIN.get(transaction_type.lower())
+        if begin is None:
+            raise ValueError(f"不支持的事务类型: {transaction_type}")
+        
         conn = None
         try:
-            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
-            if row_factory:
-                conn.row_factory = sqlite3.Row
+            conn = self._acquire(row_factory)
+            conn.execute(begin)
             
             yield conn
             
@@ -117,7 +259,7 @@ class DatabaseManager:
             raise
         finally:
             if conn:
-                conn.close()
+                self._release(conn)
     
     def execute_query(self, sql: str, params: Optional[Tuple] = None) -> List[sqlite3.Row]:
         """
@@ -177,14 +319,18 @@ class DatabaseManager:
             logger.error(f"更新执行失败: {sql}, 错误: {e}")
             raise DatabaseError(f"更新失败: {e}") from e
     
-    def execute_batch(self, sql: str, params_list: List[Tuple], batch_size: int = 1000) -> int:
+    def execute_batch(self, sql: str, params_list: Iterable[Tuple], batch_size: int = 1000) -> int:
         """
         批量执行操作（提高性能）
         
+        全部参数在同一个 BEGIN IMMEDIATE 事务中执行；传入生成器时会被完整消费，
+        无需先物化为列表。单行 INSERT 语句会改写为多行 VALUES，
+        每条语句插入最多 500 行（且不超过 999 个参数），其余语句使用 executemany
+        
         Args:
             sql: SQL语句
-            params_list: 参数列表
-            batch_size: 批量大小
+            params_list: 参数列表（或任意可迭代对象）
+            batch_size: 已不再按批切分，保留以兼容旧调用
         
         Returns:
             总共影响的行数
@@ -194,20 +340,31 @@ class DatabaseManager:
             >>> data = [(1, 'title1'), (2, 'title2'), ...]
             >>> rows = db.execute_batch("INSERT INTO news_articles (id, title) VALUES (?, ?)", data)
         """
-        if not params_list:
+        if isinstance(params_list, (list, tuple)) and not params_list:
             logger.warning("批量操作参数列表为空")
             return 0
         
-        total_affected = 0
-        total_batches = (len(params_list) + batch_size - 1) // batch_size
-        
         try:
             with self.transaction() as conn:
                 cursor = conn.cursor()
                 
-                for i in range(0, len(params_list), batch_size):
-                    batch = params_list[i:i + batch_size]
-                    cursor.executemany(sql, batch)
+                plan = _multi_values_plan(sql)
+                if plan is None:
+                    cursor.executemany(sql, params_list)
+                    return cursor.rowcount
+                
+                head, row_sql, width = plan
+                chunk_rows = max(1, min(MULTI_VALUES_ROWS, MAX_SQL_PARAMS // width))
+                full_sql = head + ','.join([row_sql] * chunk_rows)
+                
+                total_affected = 0
+                rows = iter(params_list)
+                while True:
+                    chunk = list(islice(rows, chunk_rows))
+                    if not chunk:
+                        break
+                    chunk_sql = full_sql if len(chunk) == chunk_rows else head + ','.join([row_sql] * len(chunk))
+                    cursor.execute(chunk_sql, list(chain.from_iterable(chunk)))
                     total_affected += cursor.rowcount
                 return total_affected
                 
@@ -215,6 +372,26 @@ class DatabaseManager:
             logger.error(f"批量操作失败: {e}")
             raise DatabaseError(f"批量操作失败: {e}") from e
     
+    def execute_many(self, sql: str, params_iter: Iterable[Tuple]) -> int:
+        """
+        在单个事务中用 executemany 执行（参数可以是生成器，无需先物化为列表）
+        
+        Args:
+            sql: SQL语句
+            params_iter: 参数可迭代对象
+        
+        Returns:
+            总共影响的行数
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(sql, params_iter)
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"批量操作失败: {e}")
+            raise DatabaseError(f"批量操作失败: {e}") from e
+    
     def execute_with_retry(self, func, max_retries: int = 3, retry_delay: float = 1.0):
         """
         执行操作并在失败时重试
@@ -433,6 +610,7 @@ if __name__ == '__main__':
     print(f"✓ 总行数: {count}")
     
     # 清理
+    db.close()
     test_db.unlink()
     print("\n✓ 测试完成")
 
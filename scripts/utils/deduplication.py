@@ -5,7 +5,8 @@
 
 提供智能去重功能，支持：
 - 基于标题的相似度计算
-- 模糊匹配去重
+- 模糊匹配去重（安装 rapidfuzz 时使用其 C++ 实现计算相似度）
+- MinHash-LSH 候选检索（需安装 datasketch）
 - 批量去重处理
 - 保留信息最完整的版本
 """
@@ -15,10 +16,36 @@ from difflib import SequenceMatcher
 from typing import List, Tuple, Dict, Any, Set
 from collections import defaultdict
 
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHash = None
+    MinHashLSH = None
+
+try:
+    from rapidfuzz.fuzz import ratio as fuzz_ratio
+except ImportError:
+    fuzz_ratio = None
+
 from .logger import get_logger
 
 logger = get_logger('deduplication')
 
+# MinHash 排列数与字符 shingle 长度（中文标题不分词，按连续字符切片）
+LSH_NUM_PERM = 128
+SHINGLE_SIZE = 3
+
+# 文本规范化：去除标点和特殊字符、压缩空白
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _ratio(text1: str, text2: str) -> float:
+    """两个文本的相似度（0-1），优先使用 rapidfuzz（基于 Indel 距离），未安装时使用 difflib"""
+    if fuzz_ratio is not None:
+        return fuzz_ratio(text1, text2) / 100.0
+    return SequenceMatcher(None, text1, text2).ratio()
+
 
 def normalize_text(text: str) -> str:
     """
@@ -33,21 +60,13 @@ def normalize_text(text: str) -> str:
     if not text:
         return ''
     
-    # 转小写
-    text = text.lower()
-    
-    # 移除标点和特殊字符
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # 压缩空白
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    # 转小写 -> 移除标点和特殊字符 -> 压缩空白
+    return _WHITESPACE_RE.sub(' ', _PUNCT_RE.sub('', text.lower())).strip()
 
 
 def calculate_similarity(text1: str, text2: str, normalize: bool = True) -> float:
     """
-    计算两个文本的相似度（基于编辑距离）
+    计算两个文本的相似度（基于编辑距离，安装 rapidfuzz 时使用其 C++ 实现）
     
     Args:
         text1: 文本1
@@ -68,7 +87,7 @@ def calculate_similarity(text1: str, text2: str, normalize: bool = True) -> floa
         text1 = normalize_text(text1)
         text2 = normalize_text(text2)
     
-    return SequenceMatcher(None, text1, text2).ratio()
+    return _ratio(text1, text2)
 
 
 def find_similar_pairs(items: List[Dict[str, Any]], 
@@ -102,23 +121,60 @@ def find_similar_pairs(items: List[Dict[str, Any]],
     
     logger.info(f"开始查找相似项，共 {n} 个项目，阈值={threshold}")
     
-    # 两两比较
-    for i in range(n):
-        text1 = items[i].get(key, '')
-        if not text1:
+    # 每个文本只规范化一次（原始为空的项不参与比较）
+    texts = []
+    for item in items:
+        text = item.get(key, '')
+        if not text:
+            texts.append(None)
+        else:
+            texts.append(normalize_text(text) if use_normalize else text)
+    
+    if fuzz_ratio is not None:
+        # rapidfuzz 在 C++ 中比较，低于 score_cutoff 时提前终止并返回 0
+        cutoff = threshold * 100
+        for i in range(n):
+            text1 = texts[i]
+            if text1 is None:
+                continue
+            
+            for j in range(i + 1, n):
+                text2 = texts[j]
+                if text2 is None:
+                    continue
+                
+                score = fuzz_ratio(text1, text2, score_cutoff=cutoff)
+                if score >= cutoff:
+                    similar_pairs.append((i, j, score / 100.0))
+                    logger.debug(f"发现相似项: [{i}] vs [{j}], 相似度={score / 100.0:.2%}")
+        
+        logger.info(f"发现 {len(similar_pairs)} 对相似项")
+        return similar_pairs
+    
+    # 两两比较：固定后一项为 seq2，SequenceMatcher 只需为其建立一次索引；
+    # real_quick_ratio / quick_ratio 是 ratio 的上界，低于阈值时跳过精确计算
+    matcher = SequenceMatcher(None)
+    for j in range(1, n):
+        text2 = texts[j]
+        if text2 is None:
             continue
+        matcher.set_seq2(text2)
         
-        for j in range(i + 1, n):
-            text2 = items[j].get(key, '')
-            if not text2:
+        for i in range(j):
+            text1 = texts[i]
+            if text1 is None:
                 continue
             
-            similarity = calculate_similarity(text1, text2, normalize=use_normalize)
+            matcher.set_seq1(text1)
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
             
+            similarity = matcher.ratio()
             if similarity >= threshold:
                 similar_pairs.append((i, j, similarity))
                 logger.debug(f"发现相似项: [{i}] vs [{j}], 相似度={similarity:.2%}")
     
+    similar_pairs.sort()
     logger.info(f"发现 {len(similar_pairs)} 对相似项")
     return similar_pairs
 
@@ -159,7 +215,7 @@ def find_duplicates_fast(items: List[Dict[str, Any]],
         
         for i, (idx1, text1) in enumerate(group_items):
             for idx2, text2 in group_items[i + 1:]:
-                similarity = SequenceMatcher(None, text1, text2).ratio()
+                similarity = _ratio(text1, text2)
                 if similarity >= threshold:
                     similar_pairs.append((idx1, idx2, similarity))
     
@@ -167,6 +223,66 @@ def find_duplicates_fast(items: List[Dict[str, Any]],
     return similar_pairs
 
 
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """将规范化文本切分为字符 shingle 集合"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def find_duplicates_lsh(items: List[Dict[str, Any]], 
+                        key: str = 'title',
+                        threshold: float = 0.85,
+                        lsh_threshold: float = 0.5,
+                        num_perm: int = LSH_NUM_PERM) -> List[Tuple[int, int, float]]:
+    """
+    基于 MinHash-LSH 查找重复项（近似线性复杂度）
+    
+    每个项目只与 LSH 桶中的候选项精确比较，不再两两比较。
+    未安装 datasketch 时回退到 find_duplicates_fast。
+    
+    Args:
+        items: 数据项列表
+        key: 用于比较的字段名
+        threshold: 相似度阈值（与其他模式含义相同，候选项按编辑距离相似度复核）
+        lsh_threshold: LSH 候选检索的 Jaccard 阈值，需低于 threshold 以免漏召回
+        num_perm: MinHash 排列数
+    
+    Returns:
+        重复项对列表
+    """
+    if not items:
+        return []
+    
+    if MinHashLSH is None:
+        logger.debug("未安装 datasketch，使用快速模式查找重复")
+        return find_duplicates_fast(items, key, threshold)
+    
+    lsh = MinHashLSH(threshold=lsh_threshold, num_perm=num_perm)
+    texts: Dict[int, str] = {}
+    similar_pairs = []
+    
+    for i, item in enumerate(items):
+        text = normalize_text(item.get(key, ''))
+        if not text:
+            continue
+        
+        minhash = MinHash(num_perm=num_perm)
+        minhash.update_batch([s.encode('utf-8') for s in _shingles(text)])
+        
+        # 只对 LSH 候选项计算精确相似度
+        for j in lsh.query(minhash):
+            similarity = _ratio(texts[j], text)
+            if similarity >= threshold:
+                similar_pairs.append((j, i, similarity))
+        
+        lsh.insert(i, minhash)
+        texts[i] = text
+    
+    logger.info(f"LSH模式发现 {len(similar_pairs)} 对相似项")
+    return similar_pairs
+
+
 def select_best_item(items: List[Dict[str, Any]], 
                     indices: List[int],
                     priority_keys: List[str] = ['content', 'summary', 'published']) -> int:
@@ -215,13 +331,17 @@ def select_best_item(items: List[Dict[str, Any]],
     return best_idx
 
 
-def deduplicate_items(items: List[Dict[str, Any]], 
-                     key: str = 'title',
-                     threshold: float = 0.85,
-                     priority_keys: List[str] = ['content', 'summary'],
-                     use_fast_mode: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+def deduplicate_indices(items: List[Any], 
+                        key: str = 'title',
+                        threshold: float = 0.85,
+                        priority_keys: List[str] = ['content', 'summary'],
+                        use_fast_mode: bool = True,
+                        use_lsh: bool = True) -> Tuple[List[int], Dict[str, Any]]:
     """
-    去重处理（保留最佳项）
+    去重处理，返回保留项的下标（不复制数据项）
+    
+    items 中的元素只需支持 .get(字段, 默认值)，可直接传入 feedparser 条目，
+    调用方按返回的下标从自己的数据中取出保留项。
     
     Args:
         items: 数据项列表
@@ -229,83 +349,138 @@ def deduplicate_items(items: List[Dict[str, Any]],
         threshold: 相似度阈值
         priority_keys: 选择最佳项的优先级字段
         use_fast_mode: 是否使用快速模式
+        use_lsh: 快速模式下是否使用 MinHash-LSH 查找候选（未安装 datasketch 时自动回退）
     
     Returns:
-        (去重后的列表, 统计信息)
+        (按原顺序排列的保留项下标, 统计信息)
     
     Example:
-        >>> articles = [...]
-        >>> unique_articles, stats = deduplicate_items(
-        ...     articles,
-        ...     threshold=0.85,
-        ...     priority_keys=['content', 'summary']
-        ... )
-        >>> print(f"去重前: {stats['before']}, 去重后: {stats['after']}")
+        >>> kept, stats = deduplicate_indices(entries, threshold=0.85, priority_keys=['summary'])
+        >>> unique_entries = [entries[i] for i in kept]
     """
     if not items:
-        return items, {'before': 0, 'after': 0, 'removed': 0}
+        return [], {'before': 0, 'after': 0, 'removed': 0}
     
     original_count = len(items)
     logger.info(f"开始去重处理，原始项目数: {original_count}")
     
-    # 查找相似项
-    if use_fast_mode:
-        similar_pairs = find_duplicates_fast(items, key, threshold)
+    # 规范化文本完全相同的项直接判为重复，每组只留一个代表参与相似度计算
+    exact_pairs = []
+    first_seen: Dict[str, int] = {}
+    representatives = []
+    for i, item in enumerate(items):
+        text = normalize_text(item.get(key, ''))
+        if text in first_seen:
+            exact_pairs.append((first_seen[text], i, 1.0))
+            continue
+        if text:
+            first_seen[text] = i
+        representatives.append(i)
+    
+    if exact_pairs:
+        logger.info(f"完全重复: {len(exact_pairs)} 项")
+    
+    # 查找相似项（只在代表项之间比较，下标映射回原列表）
+    candidates = [items[i] for i in representatives]
+    if use_fast_mode and use_lsh:
+        fuzzy_pairs = find_duplicates_lsh(candidates, key, threshold)
+    elif use_fast_mode:
+        fuzzy_pairs = find_duplicates_fast(candidates, key, threshold)
     else:
-        similar_pairs = find_similar_pairs(items, key, threshold)
+        fuzzy_pairs = find_similar_pairs(candidates, key, threshold)
+    
+    similar_pairs = exact_pairs + [
+        (representatives[i], representatives[j], similarity) for i, j, similarity in fuzzy_pairs
+    ]
     
     if not similar_pairs:
         logger.info("未发现重复项")
-        return items, {
+        return list(range(original_count)), {
             'before': original_count,
             'after': original_count,
             'removed': 0,
             'duplicate_groups': 0
         }
     
-    # 构建重复组（使用并查集）
-    parent = list(range(len(items)))
+    # 构建重复组（并查集只登记出现在相似对中的项，路径减半，无递归调用）
+    parent: Dict[int, int] = {}
     
     def find(x):
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-    
-    def union(x, y):
-        px, py = find(x), find(y)
-        if px != py:
-            parent[px] = py
-    
-    # 合并重复项
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    # 合并重复项（每次成功合并减少一个组）
+    merges = 0
     for idx1, idx2, _ in similar_pairs:
-        union(idx1, idx2)
+        root1, root2 = find(idx1), find(idx2)
+        if root1 != root2:
+            parent[root1] = root2
+            merges += 1
     
-    # 分组
+    # 分组（按下标升序加入，与逐项扫描时的组内顺序一致）
     groups = defaultdict(list)
-    for i in range(len(items)):
-        root = find(i)
-        groups[root].append(i)
+    for i in sorted(parent):
+        groups[find(i)].append(i)
     
-    # 从每组中选择最佳项
-    indices_to_keep = set()
+    # 未出现在任何相似对中的项各自成组，直接保留；其余每组选择最佳项
+    indices_to_keep = set(range(original_count)).difference(parent)
     for group_indices in groups.values():
         best_idx = select_best_item(items, group_indices, priority_keys)
         indices_to_keep.add(best_idx)
     
-    # 保留选中的项
-    unique_items = [items[i] for i in sorted(indices_to_keep)]
+    kept_indices = sorted(indices_to_keep)
     
     stats = {
         'before': original_count,
-        'after': len(unique_items),
-        'removed': original_count - len(unique_items),
-        'duplicate_groups': len(groups),
+        'after': len(kept_indices),
+        'removed': original_count - len(kept_indices),
+        'duplicate_groups': original_count - merges,
         'similar_pairs': len(similar_pairs)
     }
     
     logger.info(f"去重完成: {stats['before']} -> {stats['after']}, 移除 {stats['removed']} 项, {stats['duplicate_groups']} 个重复组")
     
-    return unique_items, stats
+    return kept_indices, stats
+
+
+def deduplicate_items(items: List[Dict[str, Any]], 
+                     key: str = 'title',
+                     threshold: float = 0.85,
+                     priority_keys: List[str] = ['content', 'summary'],
+                     use_fast_mode: bool = True,
+                     use_lsh: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    去重处理（保留最佳项）
+    
+    Args:
+        items: 数据项列表
+        key: 用于比较的字段名
+        threshold: 相似度阈值
+        priority_keys: 选择最佳项的优先级字段
+        use_fast_mode: 是否使用快速模式
+        use_lsh: 快速模式下是否使用 MinHash-LSH 查找候选（未安装 datasketch 时自动回退）
+    
+    Returns:
+        (去重后的列表, 统计信息)
+    
+    Example:
+        >>> articles = [...]
+        >>> unique_articles, stats = deduplicate_items(
+        ...     articles,
+        ...     threshold=0.85,
+        ...     priority_keys=['content', 'summary']
+        ... )
+        >>> print(f"去重前: {stats['before']}, 去重后: {stats['after']}")
+    """
+    kept_indices, stats = deduplicate_indices(
+        items, key, threshold, priority_keys, use_fast_mode, use_lsh
+    )
+    if len(kept_indices) == len(items):
+        return items, stats
+    return [items[i] for i in kept_indices], stats
 
 
 def mark_duplicates(items: List[Dict[str, Any]], 
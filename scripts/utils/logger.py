@@ -13,11 +13,16 @@
 
 import logging
 import sys
-from pathlib import Path
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 from datetime import datetime
 from typing import Optional
 
+# 直接运行本文件时没有包上下文，从同目录导入
+try:
+    from ._paths import PROJECT_ROOT
+except ImportError:
+    from _paths import PROJECT_ROOT
+
 
 class ColoredFormatter(logging.Formatter):
     """彩色日志格式化器（仅用于终端输出）"""
@@ -63,7 +68,7 @@ class LoggerManager:
     def _setup_handlers(self):
         """配置日志处理器"""
         # 创建日志目录
-        log_dir = Path(__file__).resolve().parents[2] / 'logs'
+        log_dir = PROJECT_ROOT / 'logs'
         log_dir.mkdir(parents=True, exist_ok=True)
         
         # 1. 控制台处理器（彩色输出）
@@ -199,5 +204,5 @@ if __name__ == '__main__':
     except Exception as e:
         logger.exception('捕获到异常')
     
-    print(f"\n日志文件位置: {Path(__file__).resolve().parents[2] / 'logs'}")
+    print(f"\n日志文件位置: {PROJECT_ROOT / 'logs'}")
 
@@ -27,16 +27,16 @@ if __name__ == '__main__':
 
 # 尝试相对导入，失败则使用绝对导入
 try:
+    from ._paths import PROJECT_ROOT
     from .logger import get_logger
     from .deduplication import deduplicate_items
 except ImportError:
+    from utils._paths import PROJECT_ROOT
     from utils.logger import get_logger
     from utils.deduplication import deduplicate_items
 
 logger = get_logger('quality_filter')
 
-# 获取项目根目录
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / 'config' / 'quality_filter_config.yml'
 
 
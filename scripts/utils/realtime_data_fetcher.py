@@ -20,6 +20,15 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# 新浪行情响应行: var hq_str_sh601899="紫金矿业,15.23,15.12,15.45,..."
+_SINA_LINE_RE = re.compile(r'var hq_str_(.+?)="(.+?)"')
+# 单代码响应中引号内的字段串
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+# 从文本中提取股票代码：带 .SS/.SZ 后缀的代码
+_SUFFIXED_CODE_RE = re.compile(r'(\d{6})\.(SS|SZ)')
+# 从文本中提取股票代码：不带后缀的沪深6位代码
+_BARE_CODE_RE = re.compile(r'\b(60[0|1|3]\d{3}|688\d{3}|00[0-3]\d{3}|300\d{3})\b')
+
 
 @dataclass
 class StockData:
@@ -115,7 +124,7 @@ class RealtimeDataFetcher:
                         continue
 
                     # 解析格式: var hq_str_sh601899="紫金矿业,15.23,15.12,15.45,..."
-                    match = re.search(r'var hq_str_(.+?)="(.+?)"', line)
+                    match = _SINA_LINE_RE.search(line)
                     if not match:
                         continue
 
@@ -165,7 +174,7 @@ class RealtimeDataFetcher:
             response.encoding = 'gbk'
 
             # 解析: var hq_str_hf_GC="黄金,2650.50,2648.30,..."
-            match = re.search(r'"([^"]+)"', response.text)
+            match = _QUOTED_RE.search(response.text)
             if match:
                 fields = match.group(1).split(',')
                 if len(fields) >= 3:
@@ -211,7 +220,7 @@ class RealtimeDataFetcher:
             response = self.session.get(url, timeout=5)
             response.encoding = 'gbk'
 
-            match = re.search(r'"([^"]+)"', response.text)
+            match = _QUOTED_RE.search(response.text)
             if match:
                 fields = match.group(1).split(',')
                 if len(fields) >= 2:
@@ -238,8 +247,7 @@ class RealtimeDataFetcher:
         codes = []
 
         # 模式1: 6位数字 + .SS 或 .SZ (如 601899.SS)
-        pattern1 = r'(\d{6})\.(SS|SZ)'
-        for match in re.finditer(pattern1, text):
+        for match in _SUFFIXED_CODE_RE.finditer(text):
             code = match.group(1)
             market = 'sh' if match.group(2) == 'SS' else 'sz'
             codes.append(f"{market}{code}")
@@ -247,8 +255,7 @@ class RealtimeDataFetcher:
         # 模式2: 直接的6位数字(在财经上下文中)
         # 沪市: 600xxx, 601xxx, 603xxx, 688xxx
         # 深市: 000xxx, 001xxx, 002xxx, 003xxx, 300xxx
-        pattern2 = r'\b(60[0|1|3]\d{3}|688\d{3}|00[0-3]\d{3}|300\d{3})\b'
-        for match in re.finditer(pattern2, text):
+        for match in _BARE_CODE_RE.finditer(text):
             code = match.group(1)
             if code.startswith(('60', '68')):
                 codes.append(f"sh{code}")